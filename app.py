@@ -1,16 +1,20 @@
 import os
-import pandas as pd
 import streamlit as st
-from models.data_processor import load_data
-from functions.visualizations import (
-    generate_popularity_trends, generate_audio_features, generate_genre_analysis,
-    generate_explicit_trends, generate_album_insights, generate_tempo_mood,
-    generate_top_artists_songs, generate_album_release_trends, generate_duration_analysis,
-    generate_streaming_insights, generate_feature_comparisons, generate_network_analysis
-)
+from models.data_processor import DATE_FORMAT_COLUMN, load_catalog
+from models.search import SEARCH_KINDS
+from models.snapshot import MEMORY_MAP
+import functions.visualizations  # registers the analysis views
+from functions.registry import VIEWS, figure_cache, render_view
+from functions.instrumentation import annotate, finish_run, render_panel, stage, start_run
+
+# Timings for this rerun when PERF_PROFILE or PERF_LOG is set
+start_run()
 
 # Load Data
-df = load_data()
+with stage('load') as record:
+    catalog = load_catalog()
+    record['rows_out'] = len(catalog.df)
+df = catalog.df
 
 # Sidebar - Add Spotify Logo from URL centered at the top
 st.sidebar.markdown("<div style='display: flex; justify-content: center; align-items: center; padding: 10px 0;'>", unsafe_allow_html=True)
@@ -26,24 +30,76 @@ st.sidebar.markdown("</div>", unsafe_allow_html=True)
 
 # Sidebar - Title & Filters
 st.sidebar.title("Music Data Analysis")
-analysis_option = st.sidebar.selectbox(
-    "Choose Analysis",
-    [
-        "Popularity Trends Over Time", "Audio Features Analysis", "Genre & Artist Analysis",
-        "Explicit Content Trends", "Album & Label Insights", "Tempo & Mood Analysis",
-        "Top Artists and Songs", "Album Release Trends", "Track Duration Analysis",
-        "Streaming and Engagement Insights", "Feature Comparisons Across Decades",
-        "Network Analysis"
-    ]
-)
+analysis_option = st.sidebar.selectbox("Choose Analysis", list(VIEWS))
+annotate(view=analysis_option)
+
+# Search: names from the catalog's trigram index, see models/search.py. An
+# artist or album narrows the selection below; a track is highlighted.
+highlight, searched = None, {}
+query = st.sidebar.text_input("Search", placeholder="Track, artist or album").strip()
+if query and not df.empty:
+    with stage('search') as record, st.spinner("Indexing names..."):
+        results = catalog.search_index.search(query)
+        record['rows_out'] = len(results)
+    if results.empty:
+        st.sidebar.caption(f"Nothing matches '{query}'.")
+    else:
+        labels = {
+            f"{kind}: {name} ({popularity}, {tracks:,} track{'s' if tracks != 1 else ''})": (kind, name)
+            for kind, name, popularity, tracks in results.itertuples(index=False)
+        }
+        choice = st.sidebar.selectbox("Results", ["Show all"] + list(labels))
+        if choice != "Show all":
+            kind, name = labels[choice]
+            if kind == 'Track':
+                highlight = name
+            else:
+                searched[SEARCH_KINDS[kind]] = [name]
 
 st.sidebar.subheader("Filters")
 if not df.empty and 'Decade' in df.columns:
-    decades = st.sidebar.multiselect("Select Decades", sorted(df['Decade'].unique()), default=sorted(df['Decade'].unique()))
-    filtered_df = df[df['Decade'].isin(decades)] if decades else df
+    decades = st.sidebar.multiselect("Select Decades", catalog.decades, default=catalog.decades)
+    # Further filters narrow the decades; each is answered from the catalog's
+    # bitmap indexes, see models/filters.py
+    filters = {}
+    with st.sidebar.expander("More Filters"):
+        if 'Popularity' in df.columns:
+            popularity = st.slider("Popularity", min_value=0, max_value=100, value=(0, 100))
+            if popularity != (0, 100):
+                filters['Popularity'] = popularity
+        if 'Explicit' in df.columns:
+            explicit = st.radio("Explicit", ["Any", "Explicit", "Clean"], horizontal=True)
+            if explicit != "Any":
+                filters['Explicit'] = [explicit == "Explicit"]
+        if 'Label' in df.columns:
+            filters['Label'] = st.multiselect("Label", sorted(df['Label'].cat.categories, key=str))
+        if catalog.genres is not None:
+            filters['Artist Genres'] = st.multiselect("Genre", catalog.genres.values)
+        if catalog.artists is not None:
+            names = st.text_input("Artist", help="Exact artist names, comma-separated")
+            artists = [name.strip() for name in names.split(',') if name.strip()]
+            unknown = [name for name in artists if catalog.artists.code_of(name) < 0]
+            if unknown:
+                st.warning(f"No artist named {', '.join(repr(name) for name in unknown)}.")
+            filters['Artist Name(s)'] = artists
+    # A picked search result takes the place of its column's filter
+    filters.update(searched)
+    with stage('filter', rows_in=len(df)) as record:
+        selection = catalog.select(decades, filters, highlight)
+        record['rows_out'] = len(selection.rows)
 else:
     st.sidebar.warning("No data loaded or 'Decade' column missing. Check the 'data' folder.")
-    filtered_df = pd.DataFrame()
+    selection = catalog.select([])
+
+if DATE_FORMAT_COLUMN in df.columns or not catalog.rejected.empty:
+    skipped = f", {len(catalog.rejected):,} rows skipped" if not catalog.rejected.empty else ""
+    with st.sidebar.expander(f"Release dates{skipped}"):
+        if DATE_FORMAT_COLUMN in df.columns:
+            formats = df[DATE_FORMAT_COLUMN].value_counts(sort=False)
+            st.caption("Formats found: " + ", ".join(f"{name} {count:,}" for name, count in formats.items()))
+        if skipped:
+            st.caption("Skipped rows' 'Album Release Date' is not YYYY, YYYY-MM or YYYY-MM-DD.")
+            st.dataframe(catalog.rejected.head(1000), hide_index=True)
 
 # Add View Raw Data link at the bottom of the sidebar
 st.sidebar.markdown("[View Raw Data Source](https://www.kaggle.com/datasets/joebeachcapital/top-10000-spotify-songs-1960-now)", unsafe_allow_html=True)
@@ -52,40 +108,25 @@ st.sidebar.markdown("[View Raw Data Source](https://www.kaggle.com/datasets/joeb
 st.title("Music Data Analysis Dashboard")
 st.markdown("Explore trends and insights from a diverse music dataset.")
 
-# Call Analysis Functions Based on Selection with updated explanations
-if analysis_option == "Popularity Trends Over Time":
-    st.markdown("**Popularity Trends:** Tracks popularity changes over time.")
-    generate_popularity_trends(filtered_df)
-elif analysis_option == "Audio Features Analysis":
-    st.markdown("**Audio Features:** Shows feature distributions.")
-    generate_audio_features(filtered_df)
-elif analysis_option == "Genre & Artist Analysis":
-    st.markdown("**Genre & Artist:** Highlights top genres.")
-    generate_genre_analysis(filtered_df)
-elif analysis_option == "Explicit Content Trends":
-    st.markdown("**Explicit Trends:** Compares explicit songs.")
-    generate_explicit_trends(filtered_df)
-elif analysis_option == "Album & Label Insights":
-    st.markdown("**Album & Label:** Displays top labels.")
-    generate_album_insights(filtered_df)
-elif analysis_option == "Tempo & Mood Analysis":
-    st.markdown("**Tempo & Mood:** Tracks tempo trends.")
-    generate_tempo_mood(filtered_df)
-elif analysis_option == "Top Artists and Songs":
-    st.markdown("**Top Artists/Songs:** Lists top artists and songs.")
-    generate_top_artists_songs(filtered_df)
-elif analysis_option == "Album Release Trends":
-    st.markdown("**Album Trends:** Shows release patterns.")
-    generate_album_release_trends(filtered_df)
-elif analysis_option == "Track Duration Analysis":
-    st.markdown("**Duration Analysis:** Displays track durations.")
-    generate_duration_analysis(filtered_df)
-elif analysis_option == "Streaming and Engagement Insights":
-    st.markdown("**Streaming Insights:** Explores engagement trends.")
-    generate_streaming_insights(filtered_df)
-elif analysis_option == "Feature Comparisons Across Decades":
-    st.markdown("**Feature Comparisons:** Compares features across decades.")
-    generate_feature_comparisons(filtered_df)
-elif analysis_option == "Network Analysis":
-    st.markdown("**Network Analysis:** Visualizes artist connections.")
-    generate_network_analysis(filtered_df)
\ No newline at end of file
+# Render only the selected analysis; see functions/registry.py
+st.markdown(VIEWS[analysis_option].summary)
+if len(selection.rows) or df.empty:
+    render_view(analysis_option, selection)
+else:
+    st.warning("No tracks match the current filters.")
+
+# Memory report: the catalog is held once per process, so a session only
+# adds the row ids and columns its selection gathered on this run
+session_bytes = selection.nbytes
+peak_bytes = max(session_bytes, st.session_state.get('peak_session_bytes', 0))
+st.session_state['peak_session_bytes'] = peak_bytes
+with st.sidebar.expander("Memory"):
+    st.caption(f"Shared catalog: {catalog.nbytes / 2**20:,.1f} MiB" + (" (memory-mapped snapshot)" if MEMORY_MAP else ""))
+    st.caption(f"This session: {session_bytes / 2**20:,.2f} MiB this run, {peak_bytes / 2**20:,.2f} MiB peak")
+    cache = figure_cache().stats()
+    st.caption(
+        f"Figure cache: {cache['entries']} result(s), {cache['bytes'] / 2**20:,.1f} of {cache['max_bytes'] / 2**20:,.0f} MiB; "
+        f"{cache['hits']:,} hit(s), {cache['misses']:,} miss(es) ({cache['hit_rate']:.0%}), {cache['evictions']:,} evicted"
+    )
+
+render_panel(finish_run())
@@ -0,0 +1,189 @@
+"""Headless benchmark for ingest and every registered view.
+
+    python -m benchmarks.run --sizes 10k,100k
+    python -m benchmarks.run --sizes 1m --compare benchmarks/results/<earlier>.json
+
+Synthetic CSVs are cached under benchmarks/.data/, and each run is written to
+benchmarks/results/<commit>-<timestamp>.json.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import pandas as pd
+import streamlit as st
+
+from benchmarks.synthetic import write_csv
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, '.data')
+RESULTS_DIR = os.path.join(HERE, 'results')
+SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    if text[-1] in SUFFIXES:
+        return int(float(text[:-1]) * SUFFIXES[text[-1]])
+    return int(text)
+
+
+def _quiet_streamlit():
+    # Without `streamlit run` there is no script context: st.* calls become
+    # no-ops and the caches fall back to in-memory storage. Their warnings
+    # would swamp the report. Streamlit resets log levels when it first
+    # parses its config, so parse it before lowering them.
+    from streamlit import config, logger
+
+    config.get_config_options()
+    logger.set_log_level('error')
+
+
+def _clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def measure(fn, track_memory=True):
+    # (result, seconds, peak traced bytes)
+    if track_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    peak = None
+    if track_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def dataset(n, seed):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = os.path.join(DATA_DIR, f'music_{n}_{seed}.csv')
+    if not os.path.exists(path):
+        print(f'  generating {n:,} rows -> {path}', flush=True)
+        tmp = path + '.tmp'
+        write_csv(n, tmp, seed=seed)
+        os.replace(tmp, path)
+    return path
+
+
+def bench_size(n, seed, track_memory, repeat):
+    from models.catalog import Catalog
+    from models.data_processor import _read_chunks, _read_raw, process_data
+    from models.snapshot import load_snapshot, save_snapshot, source_fingerprint
+    from functions.figure_cache import FigureCache
+    from functions.registry import FIGURE_CACHE_BYTES, iter_tabs
+    import functions.visualizations  # noqa: F401  registers the views
+
+    path = dataset(n, seed)
+    stages = []
+
+    def record(stage, fn, **extra):
+        result, seconds, peak = measure(fn, track_memory)
+        stages.append(dict(stage=stage, seconds=round(seconds, 6), peak_bytes=peak, **extra))
+        print(f'  {stage:<60} {seconds * 1000:>10.1f} ms' + (f'  {peak / 2**20:>8.1f} MiB' if peak else ''), flush=True)
+        return result
+
+    raw = record('ingest/read_csv', lambda: _read_raw(path), rows=n)
+    df = record('ingest/process', lambda: process_data(raw))
+    del raw
+    catalog = record('ingest/catalog', lambda: Catalog(df, version='bench'))
+    record('ingest/chunked', lambda: Catalog.from_chunks(_read_chunks(path), version='bench'))
+    # A chart drop: the last 5% of rows appended to a catalog of the rest
+    cut = len(df) - len(df) // 20
+    head = Catalog(df.iloc[:cut], version='bench')
+    record('ingest/append', lambda: head.append([df.iloc[cut:]], version='bench'), rows=len(df) - cut)
+    del head
+    with tempfile.TemporaryDirectory() as tmp:
+        # Snapshot round trip against a copy of the source in a scratch folder
+        scratch = os.path.join(tmp, 'music_data.csv')
+        os.symlink(path, scratch)
+        fingerprint = record('snapshot/fingerprint', lambda: source_fingerprint(scratch))
+        record('snapshot/save', lambda: save_snapshot(scratch, fingerprint, catalog.df, catalog.to_arrays()))
+        record('snapshot/load', lambda: Catalog(*load_snapshot(scratch, fingerprint), version='bench'))
+
+    cache = FigureCache(FIGURE_CACHE_BYTES)
+    selections = {'all': catalog.select(catalog.decades), 'recent': catalog.select(catalog.decades[-2:])}
+    for label, sel in selections.items():
+        for tab in iter_tabs():
+            if tab.missing(sel.columns, tab.defaults):
+                continue
+            name = f'view/{label}/{tab.view.name}/{tab.name}'
+            for _ in range(repeat):
+                _clear_caches()
+                outputs = record(name, lambda: tab.compute(sel, **tab.defaults), rows=len(sel.rows))
+            figures = [o for o in outputs if hasattr(o, 'to_json')]
+            record(name.replace('view/', 'serialize/', 1), lambda: [f.to_json() for f in figures])
+            # A repeat request for the same tab and selection
+            cache.put(name, outputs)
+            record(name.replace('view/', 'cached/', 1), lambda: cache.get(name))
+    return stages
+
+
+def _commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def compare(current, baseline_path):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    before = {(r['size'], r['stage']): r['seconds'] for r in baseline['results']}
+    print(f"\nCompared with {baseline['commit']} ({baseline['timestamp']}):")
+    for r in current['results']:
+        old = before.get((r['size'], r['stage']))
+        if old:
+            change = (r['seconds'] - old) / old * 100
+            flag = '  <-- slower' if change > 20 and r['seconds'] - old > 0.005 else ''
+            print(f"  {r['size']:>10,} {r['stage']:<60} {old * 1000:>9.1f} -> {r['seconds'] * 1000:>9.1f} ms ({change:+.0f}%){flag}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='10k,100k', help='comma-separated row counts, e.g. 10k,100k,1m,10m')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=1, help='runs per view (the last one is kept)')
+    parser.add_argument('--no-memory', action='store_true', help='skip tracemalloc; timings get closer to production')
+    parser.add_argument('--compare', help='earlier results file to diff against')
+    parser.add_argument('--out', default=RESULTS_DIR)
+    args = parser.parse_args(argv)
+
+    _quiet_streamlit()
+    results = []
+    for size in [parse_size(s) for s in args.sizes.split(',')]:
+        print(f'{size:,} rows', flush=True)
+        for stage in bench_size(size, args.seed, not args.no_memory, args.repeat):
+            results.append(dict(size=size, **stage))
+
+    report = {
+        'commit': _commit(),
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'max_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+        'results': results,
+    }
+    os.makedirs(args.out, exist_ok=True)
+    out = os.path.join(args.out, f"{report['commit']}-{report['timestamp'].replace(':', '')}.json")
+    with open(out, 'w') as f:
+        json.dump(report, f, indent=1)
+    print(f'\nmax RSS {report["max_rss_bytes"] / 2**20:.0f} MiB; results written to {out}')
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == '__main__':
+    main()
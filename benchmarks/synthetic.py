@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+# Column order of the Kaggle "Top 10000 Spotify Songs 1960-now" export
+COLUMNS = [
+    'Track URI', 'Track Name', 'Artist URI(s)', 'Artist Name(s)', 'Album URI', 'Album Name',
+    'Album Artist URI(s)', 'Album Artist Name(s)', 'Album Release Date', 'Album Image URL',
+    'Disc Number', 'Track Number', 'Track Duration (ms)', 'Track Preview URL', 'Explicit',
+    'Popularity', 'ISRC', 'Added By', 'Added At', 'Artist Genres', 'Danceability', 'Energy',
+    'Key', 'Loudness', 'Mode', 'Speechiness', 'Acousticness', 'Instrumentalness', 'Liveness',
+    'Valence', 'Tempo', 'Time Signature', 'Album Genres', 'Label', 'Copyrights',
+]
+WORDS = np.array([
+    'love', 'night', 'heart', 'dance', 'fire', 'dream', 'baby', 'girl', 'summer', 'light',
+    'time', 'home', 'blue', 'wild', 'gold', 'rain', 'star', 'road', 'city', 'forever',
+])
+GENRE_STEMS = np.array(['pop', 'rock', 'hip hop', 'soul', 'indie', 'house', 'folk', 'metal', 'r&b', 'country'])
+GENRE_PREFIXES = np.array(['', 'dance ', 'uk ', 'alt ', 'classic ', 'neo ', 'post-', 'k-', 'art ', 'latin '])
+CHUNK_ROWS = 500_000
+
+
+def _join(pool, codes, counts):
+    # Comma-join up to codes.shape[1] names per row, vectorized column by column
+    out = pd.Series(pool[codes[:, 0]])
+    for i in range(1, codes.shape[1]):
+        extra = ',' + pd.Series(pool[codes[:, i]])
+        out = out.where(counts <= i, out + extra)
+    return out
+
+
+def generate(n, seed=0, start=0):
+    # n Spotify-like rows with realistic cardinalities: artists and albums
+    # grow with n, a skewed artist popularity, 1-3 artists per track, 0-4
+    # genres and a mix of full-date, year-month and bare-year release dates.
+    rng = np.random.default_rng(seed + start)
+    ids = np.arange(start, start + n)
+    n_artists = max(50, (start + n) // 6)
+    n_genres = len(GENRE_STEMS) * len(GENRE_PREFIXES) * 3
+
+    artists = np.char.add('Artist ', np.arange(n_artists).astype(str))
+    genres = np.char.add(
+        np.char.add(np.repeat(GENRE_PREFIXES, len(GENRE_STEMS) * 3), np.tile(np.repeat(GENRE_STEMS, 3), len(GENRE_PREFIXES))),
+        np.tile(np.array(['', ' wave', ' revival']), len(GENRE_STEMS) * len(GENRE_PREFIXES)),
+    )
+    artist_codes = np.minimum(rng.zipf(1.3, size=(n, 3)) - 1, n_artists - 1)
+    artist_codes = (artist_codes + rng.integers(0, n_artists, size=(n, 1))) % n_artists
+    artist_counts = rng.choice([1, 2, 3], size=n, p=[0.78, 0.17, 0.05])
+    genre_codes = rng.integers(0, n_genres, size=(n, 4))
+    genre_counts = rng.choice([0, 1, 2, 3, 4], size=n, p=[0.08, 0.25, 0.3, 0.22, 0.15])
+
+    year = np.clip(np.round(rng.normal(1995, 17, n)), 1950, 2024).astype(int)
+    month = rng.integers(1, 13, n)
+    day = rng.integers(1, 29, n)
+    date_format = rng.choice(3, size=n, p=[0.85, 0.05, 0.10])
+    year_s = pd.Series(year.astype(str))
+    month_s = pd.Series(month.astype(str)).str.zfill(2)
+    day_s = pd.Series(day.astype(str)).str.zfill(2)
+    dates = (year_s + '-' + month_s + '-' + day_s).where(date_format == 0, year_s + '-' + month_s)
+    dates = dates.where(date_format != 2, year_s)
+
+    album_ids = ids // 10
+    track_names = pd.Series(WORDS[rng.integers(0, len(WORDS), n)]).str.title() + ' ' + pd.Series(WORDS[rng.integers(0, len(WORDS), n)])
+    artist_names = _join(artists, artist_codes, artist_counts)
+    artist_genres = _join(genres, genre_codes, np.maximum(genre_counts, 1)).where(genre_counts > 0, np.nan)
+    id_s = pd.Series(ids.astype(str))
+
+    df = pd.DataFrame({
+        'Track URI': 'spotify:track:' + id_s,
+        'Track Name': track_names + ' ' + id_s,
+        'Artist URI(s)': 'spotify:artist:' + pd.Series(artist_codes[:, 0].astype(str)),
+        'Artist Name(s)': artist_names,
+        'Album URI': 'spotify:album:' + pd.Series(album_ids.astype(str)),
+        'Album Name': 'Album ' + pd.Series(album_ids.astype(str)),
+        'Album Artist URI(s)': 'spotify:artist:' + pd.Series(artist_codes[:, 0].astype(str)),
+        'Album Artist Name(s)': pd.Series(artists[artist_codes[:, 0]]),
+        'Album Release Date': dates,
+        'Album Image URL': 'https://i.scdn.co/image/' + id_s,
+        'Disc Number': 1,
+        'Track Number': ids % 10 + 1,
+        'Track Duration (ms)': np.clip(rng.normal(225_000, 55_000, n), 30_000, 900_000).astype(int),
+        'Track Preview URL': np.nan,
+        'Explicit': rng.random(n) < 0.18,
+        'Popularity': np.clip(rng.normal(45, 20, n), 0, 100).astype(int),
+        'ISRC': 'USRC' + id_s.str.zfill(8),
+        'Added By': 'spotify:user:bradnumber1',
+        'Added At': '2023-01-01T00:00:00Z',
+        'Artist Genres': artist_genres,
+        'Danceability': rng.beta(5, 3, n).round(3),
+        'Energy': rng.beta(4, 3, n).round(3),
+        'Key': rng.integers(0, 12, n),
+        'Loudness': np.clip(rng.normal(-8, 3.5, n), -40, 2).round(3),
+        'Mode': rng.integers(0, 2, n),
+        'Speechiness': rng.beta(1.2, 15, n).round(4),
+        'Acousticness': rng.beta(1, 3, n).round(4),
+        'Instrumentalness': rng.beta(0.3, 8, n).round(5),
+        'Liveness': rng.beta(1.5, 8, n).round(4),
+        'Valence': rng.beta(3, 3, n).round(3),
+        'Tempo': np.clip(rng.normal(120, 28, n), 40, 230).round(3),
+        'Time Signature': rng.choice([3, 4, 5, 1], size=n, p=[0.07, 0.9, 0.02, 0.01]),
+        'Album Genres': np.nan,
+        'Label': 'Label ' + pd.Series((rng.zipf(1.5, n) % 2000).astype(str)),
+        'Copyrights': 'C ' + year_s + ' Synthetic Records',
+    }, columns=COLUMNS)
+    return df
+
+
+def write_csv(n, path, seed=0, chunk_rows=CHUNK_ROWS):
+    # Written in chunks so 10M-row files never need a 10M-row frame
+    for start in range(0, n, chunk_rows):
+        chunk = generate(min(chunk_rows, n - start), seed=seed, start=start)
+        chunk.to_csv(path, index=False, header=start == 0, mode='w' if start == 0 else 'a')
+    return path
@@ -0,0 +1,228 @@
+"""Render every analysis to static files without a browser.
+
+    python export.py --out exports
+    python export.py --selections all,each,1990+2000 --formats html,json,png --workers 8
+
+Each (selection, tab) pair is one job on a process pool. Workers are forked
+from a process that already holds the catalog, so they share its frame and
+aggregates instead of loading their own. A manifest in the output folder
+records what each job was built from and the hash of every file it wrote:
+jobs whose inputs are unchanged are skipped, and files whose bytes are
+unchanged are not rewritten. PNG output needs the optional kaleido package.
+"""
+import argparse
+import hashlib
+import html
+import importlib.util
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+import pandas as pd
+import plotly.graph_objects as go
+
+import functions.visualizations  # noqa: F401  registers the views
+from benchmarks.run import _quiet_streamlit
+from functions.registry import VIEWS, Notice, iter_tabs
+from models.data_processor import DATA_PATH, load_catalog
+
+FORMATS = ('html', 'json', 'png')
+MANIFEST = 'manifest.json'
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Set in the parent before the pool forks; workers started with spawn load it themselves
+_catalog = None
+_data_path = None
+
+
+def _load(path):
+    global _catalog, _data_path
+    if _catalog is None or _data_path != path:
+        _quiet_streamlit()
+        # Built indexes and no thread left holding their locks before the pool forks
+        _catalog, _data_path = load_catalog(path, wait=True), path
+    return _catalog
+
+
+def slug(text):
+    return re.sub(r'[^a-z0-9]+', '-', str(text).lower()).strip('-')
+
+
+def parse_selections(text, decades):
+    # 'all', 'each' (one job set per decade) or decades joined by '+'
+    selections = []
+    for part in text.split(','):
+        part = part.strip()
+        if part == 'all':
+            selections.append(tuple(decades))
+        elif part == 'each':
+            selections.extend((d,) for d in decades)
+        else:
+            selections.append(tuple(sorted(int(d) for d in part.split('+'))))
+    return list(dict.fromkeys(selections))
+
+
+def selection_name(decades, all_decades):
+    if tuple(decades) == tuple(all_decades):
+        return 'all'
+    return '+'.join(str(d) for d in decades)
+
+
+def code_version():
+    # Changing a view or the models behind it invalidates every job
+    digest = hashlib.sha1()
+    for folder in ('functions', 'models'):
+        for name in sorted(os.listdir(os.path.join(HERE, folder))):
+            if name.endswith('.py'):
+                with open(os.path.join(HERE, folder, name), 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+
+def render_page(title, description, outputs, prefix):
+    # One self-contained page per tab, with plotly.js from the CDN
+    parts, first = [], True
+    for i, out in enumerate(outputs):
+        if isinstance(out, go.Figure):
+            parts.append(out.to_html(full_html=False, include_plotlyjs='cdn' if first else False, div_id=f'{prefix}-{i}'))
+            first = False
+        elif isinstance(out, pd.DataFrame):
+            parts.append(out.to_html(index=False, border=0))
+        elif isinstance(out, dict):
+            parts.append(pd.DataFrame([out]).to_html(index=False, border=0))
+        elif isinstance(out, Notice):
+            parts.append(f'<p class="{out.level}">{html.escape(out.text)}</p>')
+        else:
+            parts.append(f'<p>{html.escape(str(out))}</p>')
+    return (
+        f'<!doctype html>\n<html><head><meta charset="utf-8"><title>{html.escape(title)}</title></head>\n'
+        f'<body>\n<h1>{html.escape(title)}</h1>\n<p>{html.escape(description)}</p>\n'
+        + '\n'.join(parts) + '\n</body></html>\n'
+    ).encode()
+
+
+def render_files(title, description, outputs, prefix, formats):
+    # Relative file name -> bytes for one tab
+    files = {}
+    if 'html' in formats:
+        files[f'{prefix}.html'] = render_page(title, description, outputs, prefix)
+    figures = [out for out in outputs if isinstance(out, go.Figure)]
+    for i, fig in enumerate(figures):
+        name = prefix if len(figures) == 1 else f'{prefix}-{i + 1}'
+        if 'json' in formats:
+            files[f'{name}.json'] = fig.to_json().encode()
+        if 'png' in formats:
+            files[f'{name}.png'] = fig.to_image(format='png')
+    return files
+
+
+def run_job(job):
+    # (job id, input key, {path: sha1}, files written)
+    job_id, data_path, decades, view_name, tab_name, input_key, previous, out, formats = job
+    catalog = _load(data_path)
+    tab = VIEWS[view_name].tabs[tab_name]
+    sel = catalog.select(list(decades))
+    title = f'{view_name}: {tab_name} ({selection_name(sel.decades, catalog.decades)})'
+    description = tab.description.format(**tab.defaults)
+    outputs = tab.compute(sel, **tab.defaults)
+    hashes, written = {}, 0
+    for rel, data in render_files(title, description, outputs, slug(tab_name), formats).items():
+        rel = os.path.join(os.path.dirname(job_id), rel)
+        digest = hashlib.sha1(data).hexdigest()
+        hashes[rel] = digest
+        target = os.path.join(out, rel)
+        if previous.get(rel) == digest and os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target + '.tmp', 'wb') as f:
+            f.write(data)
+        os.replace(target + '.tmp', target)
+        written += 1
+    return job_id, input_key, hashes, written
+
+
+def write_index(out, manifest):
+    pages = sorted(path for job in manifest['jobs'].values() for path in job['files'] if path.endswith('.html'))
+    links = ''.join(f'<li><a href="{html.escape(path)}">{html.escape(path)}</a></li>\n' for path in pages)
+    with open(os.path.join(out, 'index.html'), 'w') as f:
+        f.write(f'<!doctype html>\n<html><head><meta charset="utf-8"><title>Music Data Analysis</title></head>\n'
+                f'<body>\n<h1>Music Data Analysis</h1>\n<ul>\n{links}</ul>\n</body></html>\n')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--data', default=DATA_PATH)
+    parser.add_argument('--out', default='exports')
+    parser.add_argument('--selections', default='all,each', help="'all', 'each' or decades joined by '+', comma-separated")
+    parser.add_argument('--formats', default='html,json', help='comma-separated subset of html,json,png')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--force', action='store_true', help='rebuild every job even if its inputs are unchanged')
+    args = parser.parse_args(argv)
+
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    unknown = set(formats) - set(FORMATS)
+    if unknown:
+        parser.error(f"unknown format(s): {', '.join(sorted(unknown))}")
+    if 'png' in formats and importlib.util.find_spec('kaleido') is None:
+        print('kaleido is not installed; skipping PNG output', file=sys.stderr)
+        formats.remove('png')
+
+    start = time.perf_counter()
+    catalog = _load(args.data)
+    if not catalog.decades:
+        print(f"No data loaded from '{args.data}'", file=sys.stderr)
+        return 1
+
+    manifest_path = os.path.join(args.out, MANIFEST)
+    try:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {'jobs': {}}
+    code = code_version()
+
+    jobs, skipped = [], 0
+    for decades in parse_selections(args.selections, catalog.decades):
+        sel = catalog.select(list(decades))
+        if not sel.decades:
+            continue
+        folder = slug(selection_name(sel.decades, catalog.decades))
+        for tab in iter_tabs():
+            if tab.missing(sel.columns, tab.defaults):
+                continue
+            job_id = f'{folder}/{slug(tab.view.name)}/{slug(tab.name)}'
+            input_key = hashlib.sha1(json.dumps(
+                [catalog.version, code, sel.decades, tab.view.name, tab.name, tab.defaults, formats], sort_keys=True, default=str
+            ).encode()).hexdigest()
+            previous = manifest['jobs'].get(job_id, {})
+            files = previous.get('files', {})
+            if (not args.force and previous.get('input') == input_key
+                    and all(os.path.exists(os.path.join(args.out, p)) for p in files)):
+                skipped += 1
+                continue
+            jobs.append((job_id, args.data, sel.decades, tab.view.name, tab.name, input_key, files, args.out, formats))
+
+    os.makedirs(args.out, exist_ok=True)
+    written = 0
+    if jobs:
+        # fork shares the already-loaded catalog with every worker
+        method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else None
+        with multiprocessing.get_context(method).Pool(min(args.workers, len(jobs))) as pool:
+            for job_id, input_key, hashes, count in pool.imap_unordered(run_job, jobs):
+                manifest['jobs'][job_id] = {'input': input_key, 'files': hashes}
+                written += count
+                print(f'  {job_id}: {count} file(s) written', flush=True)
+        tmp = manifest_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp, manifest_path)
+    write_index(args.out, manifest)
+    print(f'{len(jobs)} job(s) run, {skipped} unchanged, {written} file(s) written '
+          f'in {time.perf_counter() - start:.1f}s -> {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
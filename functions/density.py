@@ -0,0 +1,139 @@
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+import streamlit as st
+
+# Above this many rows, scatter/histogram/box figures are aggregated on the
+# server instead of shipping every point to the browser
+DENSITY_ROW_THRESHOLD = int(os.environ.get('DENSITY_ROW_THRESHOLD', 100_000))
+FIDELITY_LEVELS = ['Low', 'Medium', 'High', 'Exact']
+# Bins per axis and the cap on individually drawn outliers for each level
+FIDELITY_BINS = {'Low': 40, 'Medium': 120, 'High': 240}
+FIDELITY_OUTLIERS = {'Low': 500, 'Medium': 2000, 'High': 10000}
+# A point whose 2D bin holds at most this many rows is drawn as a marker
+SPARSE_CELL_COUNT = 2
+
+
+def fidelity_control(key):
+    return st.select_slider(
+        "Render Fidelity", options=FIDELITY_LEVELS, value='Medium', key=key,
+        help=f"Above {DENSITY_ROW_THRESHOLD:,} rows charts are binned on the server. "
+             "Higher fidelity uses finer bins and keeps more outliers; Exact plots every row."
+    )
+
+
+def use_density(n_rows, fidelity):
+    return fidelity != 'Exact' and n_rows > DENSITY_ROW_THRESHOLD
+
+
+def _values(df, col):
+    return pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+
+
+def _cap(idx, limit, seed=0):
+    if len(idx) <= limit:
+        return idx
+    return np.sort(np.random.default_rng(seed).choice(idx, limit, replace=False))
+
+
+def density_scatter(df, x, y, title, color, fidelity):
+    if not use_density(len(df), fidelity):
+        return px.scatter(df, x=x, y=y, title=title, color_discrete_sequence=[color], render_mode='webgl')
+    xs, ys = _values(df, x), _values(df, y)
+    valid = ~(np.isnan(xs) | np.isnan(ys))
+    xs, ys = xs[valid], ys[valid]
+    bins = FIDELITY_BINS[fidelity]
+    counts, x_edges, y_edges = np.histogram2d(xs, ys, bins=bins)
+    # Points in near-empty cells are the outliers a heatmap would hide
+    ix = np.clip(np.searchsorted(x_edges, xs, side='right') - 1, 0, bins - 1)
+    iy = np.clip(np.searchsorted(y_edges, ys, side='right') - 1, 0, bins - 1)
+    sparse = _cap(np.flatnonzero(counts[ix, iy] <= SPARSE_CELL_COUNT), FIDELITY_OUTLIERS[fidelity])
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2, y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=np.where(counts > 0, counts, np.nan).T,
+        colorscale='Blues', colorbar=dict(title='Tracks'), name='Density'
+    ))
+    fig.add_trace(go.Scattergl(
+        x=xs[sparse], y=ys[sparse], mode='markers', name='Sparse points',
+        marker=dict(size=4, color=color)
+    ))
+    fig.update_layout(title=f'{title} ({len(xs):,} tracks, binned)', xaxis_title=x, yaxis_title=y, showlegend=False)
+    return fig
+
+
+def binned_histogram(df, x, title, color, fidelity):
+    if not use_density(len(df), fidelity):
+        return px.histogram(df, x=x, title=title, color_discrete_sequence=[color])
+    xs = _values(df, x)
+    counts, edges = np.histogram(xs[~np.isnan(xs)], bins=FIDELITY_BINS[fidelity])
+    return histogram_figure(counts, edges, x, title, color)
+
+
+def histogram_figure(counts, edges, x, title, color):
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        marker=dict(color=color), name=x
+    ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title='count', bargap=0)
+    return fig
+
+
+def binned_box(df, x, y, title, color, fidelity):
+    if not use_density(len(df), fidelity):
+        return px.box(df, x=x, y=y, title=title, color_discrete_sequence=[color])
+    groups = df[x].to_numpy()
+    ys = _values(df, y)
+    stats, outlier_x, outlier_y = [], [], []
+    per_group = FIDELITY_OUTLIERS[fidelity] // max(len(np.unique(groups)), 1)
+    for group in np.unique(groups):
+        values = ys[(groups == group) & ~np.isnan(ys)]
+        if len(values) == 0:
+            continue
+        q1, median, q3 = np.quantile(values, [0.25, 0.5, 0.75])
+        low, high = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+        inside = values[(values >= low) & (values <= high)]
+        stats.append((group, q1, median, q3, inside.min(), inside.max()))
+        # Keep the most extreme points on each side
+        outside = np.sort(values[(values < low) | (values > high)])
+        if len(outside) > per_group:
+            outside = np.concatenate([outside[:per_group // 2], outside[len(outside) - per_group // 2:]])
+        outlier_x.append(np.full(len(outside), group))
+        outlier_y.append(outside)
+    stats = pd.DataFrame(stats, columns=[x, 'q1', 'median', 'q3', 'lowerfence', 'upperfence'])
+    return box_figure(stats, x, y, title, color, outliers=(
+        np.concatenate(outlier_x) if outlier_x else [], np.concatenate(outlier_y) if outlier_y else []
+    ))
+
+
+def selection_histogram(sel, x, title, color, fidelity):
+    # Merged per-decade sketch when available, raw rows for Exact
+    if fidelity != 'Exact' and sel.has_sketch(x):
+        counts, edges = sel.histogram(x, FIDELITY_BINS[fidelity])
+        return histogram_figure(counts, edges, x, title, color)
+    return binned_histogram(sel.frame([x]), x, title, color, fidelity)
+
+
+def selection_box(sel, y, title, color, fidelity):
+    if fidelity != 'Exact' and sel.has_sketch(y):
+        return box_figure(sel.box_stats(y), 'Decade', y, title, color, outliers=sel.outliers(y, FIDELITY_OUTLIERS[fidelity]))
+    return binned_box(sel.frame(['Decade', y]), 'Decade', y, title, color, fidelity)
+
+
+def box_figure(stats, x, y, title, color, outliers=None):
+    # Box traces from precomputed quartiles and whisker ends
+    fig = go.Figure(go.Box(
+        x=stats[x], q1=stats['q1'], median=stats['median'], q3=stats['q3'],
+        lowerfence=stats['lowerfence'], upperfence=stats['upperfence'],
+        marker=dict(color=color), line=dict(color=color), name=y
+    ))
+    if outliers is not None and len(outliers[0]):
+        fig.add_trace(go.Scattergl(
+            x=outliers[0], y=outliers[1], mode='markers', name='Outliers',
+            marker=dict(size=4, color=color, opacity=0.6)
+        ))
+    fig.update_layout(title=title, xaxis_title=x, yaxis_title=y, showlegend=False)
+    return fig
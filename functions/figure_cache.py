@@ -0,0 +1,132 @@
+import hashlib
+import pickle
+import threading
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+import plotly.graph_objects as go
+
+# A figure as its plotly spec without the layout template, plus the hash the
+# template is kept under
+_FigureSpec = namedtuple('_FigureSpec', ['spec', 'template_key'])
+# A trace array stored in a narrower dtype and the dtype it is restored to
+_Narrowed = namedtuple('_Narrowed', ['values', 'dtype'])
+
+
+class FigureCache:
+    # Byte-bounded LRU of computed tab outputs. Entries are stored encoded:
+    # figures as plotly specs with their trace arrays narrowed to the
+    # smallest dtype that holds the values exactly, and their layout
+    # template (5 KB of every figure, and the same for nearly all of them)
+    # kept once and referenced by hash. The pickled bytes are what count
+    # towards `max_bytes`, so the bound is the memory actually held.
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = self.misses = self.evictions = 0
+        self._entries = OrderedDict()
+        self._templates = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return [self._decode(item) for item in pickle.loads(payload)]
+
+    def put(self, key, outputs):
+        payload = pickle.dumps([self._encode(out) for out in outputs], protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            if key in self._entries:
+                self.nbytes -= len(self._entries.pop(key))
+            if len(payload) > self.max_bytes:
+                return
+            self._entries[key] = payload
+            self.nbytes += len(payload)
+            while self.nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.nbytes -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._templates.clear()
+            self.nbytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.nbytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+    def _encode(self, out):
+        if not isinstance(out, go.Figure):
+            return out
+        spec = out.to_plotly_json()
+        # The key stays in place, so the layout serializes in the same order
+        template = spec['layout'].get('template')
+        template_key = None
+        if template is not None:
+            spec['layout']['template'] = None
+            template_key = hashlib.sha1(pickle.dumps(template, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+            with self._lock:
+                self._templates.setdefault(template_key, template)
+        spec['data'] = [_walk(trace, _narrow) for trace in spec['data']]
+        return _FigureSpec(spec, template_key)
+
+    def _decode(self, item):
+        if not isinstance(item, _FigureSpec):
+            return item
+        spec = item.spec
+        if item.template_key is not None:
+            with self._lock:
+                spec['layout']['template'] = self._templates.get(item.template_key)
+        spec['data'] = [_walk(trace, _widen) for trace in spec['data']]
+        # The spec came out of a validated figure; validating it again costs
+        # more than building it
+        return go.Figure(spec, _validate=False)
+
+
+def _walk(value, convert):
+    if isinstance(value, dict):
+        return {k: _walk(v, convert) for k, v in value.items()}
+    if isinstance(value, (list, tuple)) and value and isinstance(value[0], dict):
+        return [_walk(v, convert) for v in value]
+    return convert(value)
+
+
+def _narrow(value):
+    # The narrowest dtype that holds every value exactly. Arrays are widened
+    # back on the way out: plotly writes float32 with float32 precision, so
+    # the figure's JSON would otherwise change.
+    if not isinstance(value, np.ndarray) or not value.size:
+        return value
+    if value.dtype.kind in 'iu':
+        low, high = value.min(), value.max()
+        for dtype in (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32):
+            if dtype().itemsize < value.itemsize and np.iinfo(dtype).min <= low and high <= np.iinfo(dtype).max:
+                return _Narrowed(value.astype(dtype), value.dtype)
+    elif value.dtype == np.float64:
+        narrow = value.astype(np.float32)
+        if np.array_equal(narrow, value, equal_nan=True):
+            return _Narrowed(narrow, value.dtype)
+    return value
+
+
+def _widen(value):
+    if isinstance(value, _Narrowed):
+        return value.values.astype(value.dtype)
+    return value
@@ -0,0 +1,161 @@
+import json
+import os
+import resource
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+# PERF_PROFILE=1 shows the timing panel in the sidebar; PERF_LOG=<path> also
+# appends one JSON line per rerun there. With neither set every hook below
+# is a no-op.
+PERF_LOG = os.environ.get('PERF_LOG') or None
+PERF_PROFILE = bool(int(os.environ.get('PERF_PROFILE', 0))) or PERF_LOG is not None
+# Reruns kept per (view, stage) for the percentiles
+PERF_HISTORY = int(os.environ.get('PERF_HISTORY', 1000))
+
+_local = threading.local()
+_log_lock = threading.Lock()
+# Yielded by stage() when profiling is off; writes to it go nowhere
+_DISCARD = {}
+
+
+class Run:
+    # The stages of one script rerun: each is a dict with `stage`, `ms` and
+    # whatever fields its caller recorded (rows_in, rows_out, cache_hit)
+
+    def __init__(self, session):
+        self.session = session
+        self.view = None
+        self.tab = None
+        self.stages = []
+        self.started = time.perf_counter()
+        self.ms = None
+        self.peak_rss_bytes = None
+
+    def to_dict(self):
+        return {
+            'ts': datetime.now(timezone.utc).isoformat(timespec='milliseconds'),
+            'session': self.session,
+            'view': self.view,
+            'tab': self.tab,
+            'ms': self.ms,
+            'peak_rss_bytes': self.peak_rss_bytes,
+            'stages': self.stages,
+        }
+
+
+class LatencyStats:
+    # Per-(view, stage) rerun timings shared by every session, newest
+    # PERF_HISTORY kept
+
+    def __init__(self, history):
+        self._samples = defaultdict(lambda: deque(maxlen=history))
+        self._lock = threading.Lock()
+
+    def add(self, run):
+        with self._lock:
+            self._samples[(run.view, 'total')].append(run.ms)
+            for record in run.stages:
+                self._samples[(run.view, record['stage'])].append(record['ms'])
+
+    def summary(self, view=None):
+        with self._lock:
+            items = [(key, np.array(values)) for key, values in self._samples.items() if view is None or key[0] == view]
+        rows = [
+            {'View': v, 'Stage': stage, 'Reruns': len(ms), 'p50 (ms)': np.percentile(ms, 50), 'p95 (ms)': np.percentile(ms, 95)}
+            for (v, stage), ms in sorted(items, key=lambda item: (str(item[0][0]), item[0][1]))
+        ]
+        return pd.DataFrame(rows, columns=['View', 'Stage', 'Reruns', 'p50 (ms)', 'p95 (ms)']).round(1)
+
+
+@st.cache_resource
+def latency_stats():
+    return LatencyStats(PERF_HISTORY)
+
+
+def start_run():
+    # Called at the top of the script; later hooks on this thread record
+    # into the run until finish_run()
+    if not PERF_PROFILE:
+        return None
+    session = st.session_state.setdefault('perf_session', uuid.uuid4().hex[:12])
+    _local.run = Run(session)
+    return _local.run
+
+
+def current_run():
+    return getattr(_local, 'run', None) if PERF_PROFILE else None
+
+
+def annotate(**fields):
+    run = current_run()
+    if run is not None:
+        for name, value in fields.items():
+            setattr(run, name, value)
+
+
+def stage(name, **fields):
+    # Times the block as one stage of the current run. The yielded dict takes
+    # fields only known once the block has run, e.g. rows_out.
+    run = current_run()
+    if run is None:
+        return nullcontext(_DISCARD)
+    return _timed(run, name, fields)
+
+
+@contextmanager
+def _timed(run, name, fields):
+    record = {'stage': name, **fields}
+    start = time.perf_counter()
+    try:
+        yield record
+    finally:
+        record['ms'] = round((time.perf_counter() - start) * 1000, 3)
+        run.stages.append(record)
+
+
+def finish_run():
+    run = current_run()
+    if run is None:
+        return None
+    _local.run = None
+    run.ms = round((time.perf_counter() - run.started) * 1000, 3)
+    run.peak_rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    latency_stats().add(run)
+    if PERF_LOG:
+        line = json.dumps(run.to_dict(), default=str)
+        with _log_lock, open(PERF_LOG, 'a') as f:
+            f.write(line + '\n')
+    return run
+
+
+def output_rows(outputs):
+    # Rows handed to the browser: frame rows plus trace points
+    total = 0
+    for out in outputs:
+        if isinstance(out, pd.DataFrame):
+            total += len(out)
+        elif isinstance(out, go.Figure):
+            for trace in out.data:
+                values = next((trace[a] for a in ('x', 'y', 'z', 'values') if a in trace and trace[a] is not None), ())
+                total += len(values)
+    return total
+
+
+def render_panel(run):
+    # Sidebar panel: this rerun's stages and percentiles across sessions
+    if run is None:
+        return
+    with st.sidebar.expander("Performance"):
+        st.caption(f"This rerun: {run.ms:,.0f} ms, process peak RSS {run.peak_rss_bytes / 2**20:,.0f} MiB")
+        st.dataframe(pd.DataFrame(run.stages, columns=['stage', 'ms', 'rows_in', 'rows_out', 'cache_hit']), hide_index=True)
+        st.caption("All sessions")
+        st.dataframe(latency_stats().summary(run.view), hide_index=True)
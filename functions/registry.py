@@ -0,0 +1,131 @@
+import os
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from functions.figure_cache import FigureCache
+from functions.instrumentation import PERF_PROFILE, annotate, output_rows, stage
+
+# View name -> View, in sidebar order
+VIEWS = OrderedDict()
+# Memory held by cached tab outputs across all sessions
+FIGURE_CACHE_BYTES = int(float(os.environ.get('FIGURE_CACHE_MB', 256)) * 2**20)
+
+
+class View:
+    def __init__(self, name, summary):
+        self.name = name
+        self.summary = summary
+        self.tabs = OrderedDict()
+
+
+class Tab:
+    # One chart area of a view. `compute(sel, **params)` returns a list of
+    # outputs (figures, frames, markdown strings, Notices or metric dicts) and
+    # must not call Streamlit; `controls(sel)` renders the tab's widgets and
+    # returns the params passed to compute. `defaults` are the params used
+    # when no UI is running (benchmarks, exports). `columns` lists every
+    # column compute reads; a name may use a param, e.g. '{feature}'.
+
+    def __init__(self, view, name, description, columns, compute, controls, defaults):
+        self.view = view
+        self.name = name
+        self.description = description
+        self.columns = list(columns)
+        self.compute = compute
+        self.controls = controls
+        self.defaults = dict(defaults or {})
+
+    def missing(self, available, params=None):
+        # Columns compute needs that `available` lacks. Without params, names
+        # depending on one are not checked yet.
+        names = [c.format(**params) for c in self.columns] if params is not None else [c for c in self.columns if '{' not in c]
+        return [c for c in names if c not in available]
+
+    def missing_message(self, missing):
+        return f"Cannot plot: {' or '.join(repr(c) for c in missing)} column missing."
+
+
+class Notice:
+    def __init__(self, level, text):
+        self.level = level
+        self.text = text
+
+
+def view(name, summary):
+    VIEWS[name] = View(name, summary)
+
+
+def tab(view_name, name, description='', columns=(), controls=None, defaults=None):
+    def register(compute):
+        owner = VIEWS[view_name]
+        owner.tabs[name] = Tab(owner, name, description, columns, compute, controls, defaults)
+        return compute
+    return register
+
+
+@st.cache_resource
+def figure_cache():
+    return FigureCache(FIGURE_CACHE_BYTES)
+
+
+def iter_tabs():
+    for owner in VIEWS.values():
+        yield from owner.tabs.values()
+
+
+def compute_tab(tab, sel, params):
+    # Results are shared across sessions per (view, tab, filter, params, data version)
+    key = (tab.view.name, tab.name, sel.key, tuple(sorted(params.items())), sel.catalog.version)
+    cache = figure_cache()
+    with stage('compute', rows_in=len(sel.rows)) as record:
+        outputs = cache.get(key)
+        record['cache_hit'] = outputs is not None
+        if outputs is None:
+            outputs = tab.compute(sel, **params)
+            cache.put(key, outputs)
+        if PERF_PROFILE:
+            record['rows_out'] = output_rows(outputs)
+    return outputs
+
+
+def render_outputs(outputs):
+    for out in outputs:
+        if isinstance(out, go.Figure):
+            st.plotly_chart(out)
+        elif isinstance(out, pd.DataFrame):
+            st.dataframe(out, hide_index=True)
+        elif isinstance(out, Notice):
+            getattr(st, out.level)(out.text)
+        elif isinstance(out, dict):
+            for col, (label, value) in zip(st.columns(len(out)), out.items()):
+                col.metric(label, f"{value:,}")
+        else:
+            st.markdown(out)
+
+
+def render_view(name, sel):
+    # Only the active tab's controls and compute run on a rerun
+    owner = VIEWS[name]
+    st.header(owner.name)
+    names = list(owner.tabs)
+    active = owner.tabs[names[0]]
+    if len(names) > 1:
+        active = owner.tabs[st.radio(
+            owner.name, names, horizontal=True, key=f"tab:{owner.name}", label_visibility='collapsed'
+        )]
+    annotate(tab=active.name)
+    missing = active.missing(sel.columns)
+    params = active.controls(sel) if active.controls and not missing else {}
+    missing = missing or active.missing(sel.columns, params)
+    if missing:
+        st.error(active.missing_message(missing))
+        return
+    if active.description:
+        st.markdown(active.description.format(**params))
+    outputs = compute_tab(active, sel, params)
+    # Includes plotly's JSON serialization inside st.plotly_chart
+    with stage('render'):
+        render_outputs(outputs)
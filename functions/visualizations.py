@@ -1,419 +1,563 @@
-import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
-import seaborn as sns
-import matplotlib.pyplot as plt
-import networkx as nx
 import plotly.graph_objects as go
+import streamlit as st
+from functions.density import density_scatter, fidelity_control, selection_box, selection_histogram
+from functions.registry import Notice, tab, view
+from models.search import SEARCH_KINDS
+from models.similarity import FEATURE_COLUMNS
+
+NETWORK_LABELS = 25
+# Rows of a highlighted track (re-releases, compilations) drawn at most
+HIGHLIGHT_ROWS = 10
+AUDIO_FEATURES = ['Danceability', 'Energy', 'Tempo', 'Loudness']
+
+# Each analysis is a view made of tabs. A tab's compute function only builds
+# data and figures; widgets live in its controls function. See functions.registry.
+
+
+view("Popularity Trends Over Time", "**Popularity Trends:** Tracks popularity changes over time.")
+
+@tab("Popularity Trends Over Time", "Average Popularity", columns=['Decade', 'Popularity'],
+     description="**Average Popularity by Decade:** This chart shows how the average popularity of songs has changed over different decades.")
+def popularity_by_decade(sel):
+    top_decades = sel.mean(['Popularity'], by='Decade').nlargest(10, 'Popularity')
+
+    fig1 = go.Figure()
+    fig1.add_trace(go.Scatter(
+        x=top_decades['Decade'],
+        y=top_decades['Popularity'],
+        mode='lines+markers',
+        fill='tonexty',
+        line=dict(color='royalblue', width=3),
+        marker=dict(size=8, color='darkblue', line=dict(width=2, color='white')),
+        name='Popularity',
+        hovertext=top_decades['Decade']
+    ))
+    fig1.update_layout(
+        title='Top 10 Decades by Average Popularity',
+        xaxis_title='Decade',
+        yaxis_title='Average Popularity Score',
+        template='plotly_white',
+        width=900,
+        height=450
+    )
+    return [fig1]
+
+@tab("Popularity Trends Over Time", "Individual Songs", columns=['Year', 'Popularity', 'Track Name', 'Artist Name(s)'],
+     description="**Top 10 Individual Songs:** This scatter plot highlights the popularity of the top 10 most popular songs over time. A track picked in the sidebar search is starred in crimson.")
+def popularity_top_scatter(sel):
+    top_songs = sel.top('Popularity', 10)
+    fig2 = px.scatter(
+        top_songs, x='Year', y='Popularity',
+        color='Popularity',
+        size='Popularity',
+        color_continuous_scale='viridis',
+        title='Top 10 Individual Songs by Popularity',
+        hover_data=['Track Name', 'Artist Name(s)', 'Year']
+    )
+    picked = sel.highlighted(HIGHLIGHT_ROWS)
+    if len(picked):
+        fig2.add_trace(go.Scatter(
+            x=picked['Year'], y=picked['Popularity'], mode='markers', name='Search result',
+            marker=dict(size=16, color='crimson', symbol='star', line=dict(width=1, color='white')),
+            hovertext=picked['Track Name'].astype(str) + ' - ' + picked['Artist Name(s)'].astype(str),
+        ))
+    fig2.update_layout(
+        xaxis_title='Release Year',
+        yaxis_title='Popularity Score',
+        template='plotly_white',
+        width=900,
+        height=500
+    )
+    return [fig2]
+
+@tab("Popularity Trends Over Time", "Top 10 Songs", columns=['Track Name', 'Artist Name(s)', 'Popularity'],
+     description="**Top 10 Most Popular Songs:** This bar chart displays the top 10 songs based on their popularity scores. A track picked in the sidebar search is outlined or added in crimson.")
+def popularity_top_bar(sel):
+    top_songs = sel.top('Popularity', 10)[['Track Name', 'Artist Name(s)', 'Popularity']]
+    fig3 = px.bar(
+        top_songs, y='Track Name', x='Popularity',
+        orientation='h', color='Popularity',
+        color_continuous_scale='deep',
+        title='Top 10 Most Popular Songs',
+        labels={'Track Name': 'Song Title', 'Popularity': 'Popularity Score'},
+        hover_data=['Track Name', 'Artist Name(s)']
+    )
+    picked = sel.highlighted(HIGHLIGHT_ROWS)
+    inside = top_songs.index.isin(picked.index)
+    if inside.any():
+        fig3.update_traces(marker_line_color='crimson', marker_line_width=np.where(inside, 4, 0))
+    elif len(picked):
+        # Outside the top 10: its own bar below them
+        fig3.add_trace(go.Bar(
+            y=picked['Track Name'].iloc[:1], x=picked['Popularity'].iloc[:1], orientation='h', name='Search result',
+            marker_color='crimson', hovertext=picked['Artist Name(s)'].iloc[:1],
+        ))
+    fig3.update_layout(
+        xaxis_title='Popularity Score',
+        yaxis_title='Song Title',
+        template='plotly_white',
+        width=900,
+        height=500
+    )
+    return [fig3]
+
+
+view("Audio Features Analysis", "**Audio Features:** Shows feature distributions.")
+
+def audio_feature_controls(sel):
+    feature = st.selectbox("Select Feature", AUDIO_FEATURES, key="audio_feature")
+    top_n = st.slider("Number of Top Songs", min_value=5, max_value=100, value=20, step=5, key="audio_top_n")
+    return {'feature': feature, 'top_n': top_n}
+
+AUDIO_DEFAULTS = {'feature': AUDIO_FEATURES[0], 'top_n': 20}
+AUDIO_COLUMNS = ['Decade', '{feature}', 'Track Name', 'Artist Name(s)']
+
+@tab("Audio Features Analysis", "Distribution", columns=AUDIO_COLUMNS, controls=audio_feature_controls, defaults=AUDIO_DEFAULTS,
+     description="**Top {top_n} {feature} Values:** This histogram displays the distribution of the top {top_n} songs based on {feature}.")
+def audio_feature_distribution(sel, feature, top_n):
+    top_features = sel.top(feature, top_n)
+    fig = px.histogram(
+        top_features, x=feature, nbins=20,
+        color='Decade',
+        barmode='overlay',
+        opacity=0.7,
+        title=f'Top {top_n} Songs by {feature}',
+        color_discrete_sequence=px.colors.qualitative.Set2,
+        hover_data=['Track Name', 'Artist Name(s)']
+    )
+    fig_all = selection_histogram(sel, feature, f'{feature} Distribution (All Songs)', px.colors.qualitative.Set2[0], 'Medium')
+    fig_all.update_layout(template='plotly_white')
+    return [
+        fig,
+        f"**{feature} Distribution:** This histogram shows {feature} across all songs in the selected decades.",
+        fig_all,
+    ]
+
+@tab("Audio Features Analysis", "By Decade", columns=AUDIO_COLUMNS, controls=audio_feature_controls, defaults=AUDIO_DEFAULTS,
+     description="**{feature} by Decade:** This box plot compares the top {top_n} {feature} values across different decades.")
+def audio_feature_by_decade(sel, feature, top_n):
+    top_features = sel.top(feature, top_n)
+    fig2 = px.box(top_features, x='Decade', y=feature,
+                  color='Decade',
+                  title=f'Top {top_n} {feature} Values by Decade',
+                  color_discrete_sequence=px.colors.qualitative.Pastel,
+                  hover_data=['Track Name', 'Artist Name(s)']
+                  )
+    fig3 = selection_box(sel, feature, f'{feature} by Decade (All Songs)', px.colors.qualitative.Pastel[0], 'Medium')
+    fig3.update_layout(template='plotly_white')
+    return [
+        fig2,
+        f"**{feature} Spread by Decade:** Quartiles of {feature} for all songs in each decade.",
+        fig3,
+    ]
+
+
+view("Genre & Artist Analysis", "**Genre & Artist:** Highlights top genres.")
+
+def top_song_genres(sel):
+    return sel.catalog.genres.explode_frame(sel.top('Popularity', 10), 'Genres')
+
+@tab("Genre & Artist Analysis", "Top Genres", columns=['Artist Genres', 'Popularity'],
+     description="**Top Genres in Top 10 Songs:** Displays the most common genres among the top 10 most popular songs.")
+def genre_top(sel):
+    top_genres = top_song_genres(sel)['Genres'].value_counts().reset_index()
+    fig1 = px.bar(
+        top_genres, x='count', y='Genres',
+        orientation='h', color='count',
+        color_continuous_scale='viridis',
+        title='Top Genres in Top 10 Songs',
+        labels={'count': 'Number of Songs', 'Genres': 'Genre Name'},
+        hover_data=['Genres', 'count']
+    )
+    fig1.update_layout(template='plotly_white', width=900, height=500)
+    return [fig1]
+
+@tab("Genre & Artist Analysis", "Genre Distribution", columns=['Artist Genres', 'Track Name', 'Popularity'],
+     description="**Genre Distribution in Top 10 Songs:** Shows how different genres contribute to the top 10 songs.")
+def genre_distribution(sel):
+    fig2 = px.bar(
+        top_song_genres(sel), x='Track Name', y='Popularity', color='Genres',
+        title='Genre Distribution in Top 10 Songs',
+        labels={'Track Name': 'Song Title', 'Popularity': 'Popularity Score', 'Genres': 'Genre'},
+        barmode='stack',
+        hover_data=['Track Name', 'Genres']
+    )
+    fig2.update_layout(template='plotly_white', width=900, height=500)
+    return [fig2]
+
+@tab("Genre & Artist Analysis", "Artist Popularity", columns=['Artist Name(s)', 'Track Name', 'Popularity'],
+     description="**Artist Popularity in Top 10 Songs:** Visualizes the most popular artists in the top 10 songs with their song count and names.")
+def genre_artist_popularity(sel):
+    top_songs = sel.top('Popularity', 10)
+    artist_popularity = top_songs.groupby('Artist Name(s)').agg({'Popularity': 'sum', 'Track Name': lambda x: list(x)}).reset_index().sort_values(by='Popularity', ascending=False)
+    artist_popularity['Song Count'] = artist_popularity['Track Name'].apply(len)
+    fig3 = px.bar(
+        artist_popularity, x='Popularity', y='Artist Name(s)',
+        orientation='h', color='Popularity',
+        color_continuous_scale='blues',
+        title='Artist Popularity in Top 10 Songs',
+        labels={'Artist Name(s)': 'Artist Name', 'Popularity': 'Total Popularity Score', 'Song Count': 'Number of Songs'},
+        hover_data={'Artist Name(s)': True, 'Popularity': True, 'Song Count': True, 'Track Name': True}
+    )
+    fig3.update_layout(template='plotly_white', width=900, height=500)
+    return [fig3]
+
+
+view("Explicit Content Trends", "**Explicit Trends:** Compares explicit songs.")
+
+@tab("Explicit Content Trends", "Explicit vs Non-Explicit", columns=['Decade', 'Explicit'],
+     description="**Explicit vs Non-Explicit Songs Over Time:** This line chart shows how the number of explicit and non-explicit songs has changed over different decades.")
+def explicit_trends(sel):
+    explicit_trends = sel.count(['Decade', 'Explicit'])
+    fig = px.line(
+        explicit_trends, x='Decade', y='Count', color='Explicit',
+        markers=True, line_shape='linear',
+        title='Explicit vs Non-Explicit Songs Over Time',
+        labels={'Decade': 'Decade', 'Count': 'Number of Songs', 'Explicit': 'Song Type'},
+        color_discrete_map={True: 'purple', False: 'green'}
+    )
+    fig.update_layout(template='plotly_white', width=900, height=500)
+    return [fig]
+
+
+view("Album & Label Insights", "**Album & Label:** Displays top labels.")
+
+@tab("Album & Label Insights", "Top Labels", columns=['Label'],
+     description="**Top Record Labels:** Displays the most dominant record labels based on the number of songs they have released.")
+def album_top_labels(sel):
+    counts = sel.frame(['Label'])['Label'].value_counts()
+    # A categorical column counts every label, including those filtered out
+    top_labels = counts[counts > 0].nlargest(10).reset_index()
+    top_labels['Label'] = top_labels['Label'].astype(str)
+    fig9 = px.sunburst(
+        top_labels, path=['Label'], values='count',
+        title='Top Record Labels by Song Count',
+        color='count', color_continuous_scale='blues',
+        labels={'Label': 'Record Label', 'count': 'Number of Songs'}
+    )
+    fig9.update_layout(template='plotly_white', width=900, height=500)
+    return [fig9]
+
+@tab("Album & Label Insights", "Album Popularity", columns=['Album Name', 'Popularity'],
+     description="**Album Popularity:** Compares the popularity of albums based on the number of songs and their average popularity score.")
+def album_popularity(sel):
+    album_pop = sel.frame(['Album Name', 'Popularity']).groupby('Album Name')['Popularity'].agg(['mean', 'count']).reset_index()
+    album_pop = album_pop.sort_values(by=['mean', 'count'], ascending=[False, False]).nlargest(10, 'mean')
+    fig10 = px.strip(
+        album_pop, x='mean', y='Album Name',
+        color='count',
+        title='Top 10 Albums by Popularity',
+        labels={'Album Name': 'Album', 'mean': 'Average Popularity Score', 'count': 'Number of Songs'},
+        hover_data={'Album Name': True, 'count': True, 'mean': True},
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    fig10.update_layout(template='plotly_white', width=900, height=500)
+    return [fig10]
+
+
+view("Tempo & Mood Analysis", "**Tempo & Mood:** Tracks tempo trends.")
+
+@tab("Tempo & Mood Analysis", "Tempo Trends", columns=['Year', 'Tempo'],
+     description="**Tempo Trends:** Tracks tempo changes.")
+def tempo_trends(sel):
+    tempo_by_year = sel.mean(['Tempo'], by='Year')
+    fig11 = px.line(tempo_by_year, x='Year', y='Tempo', title='Average Tempo Over Time', color_discrete_sequence=['orange'])
+    fig11.update_layout(template='plotly_white', width=800, height=400)
+    return [fig11]
+
+@tab("Tempo & Mood Analysis", "Mood Scatter", columns=['Valence', 'Energy', 'Popularity'],
+     description="**Mood Analysis (Valence & Energy):** Categorizes songs based on mood and energy.")
+def tempo_mood_scatter(sel):
+    top_songs = sel.top('Popularity', 10)
+    mood_by_valence = top_songs.groupby('Valence')['Energy'].mean().reset_index()
+    fig12 = px.bar(
+        mood_by_valence, x='Valence', y='Energy',
+        title='Average Energy Levels by Valence (Mood Analysis)',
+        color='Energy', color_continuous_scale='plasma'
+    )
+    fig12.update_layout(template='plotly_white', width=900, height=500)
+    return [fig12]
+
+
+view("Top Artists and Songs", "**Top Artists/Songs:** Lists top artists and songs.")
+
+@tab("Top Artists and Songs", "Top Artists", columns=['Artist Name(s)'],
+     description="**Most Featured Artists:** Shows top artists.")
+def top_artists(sel):
+    top_artists = sel.catalog.artists.value_counts(sel.rows).nlargest(10).rename_axis('Artist Name(s)').reset_index()
+    fig13 = px.bar(top_artists, x='Artist Name(s)', y='count', title='Most Featured Artists', color_discrete_sequence=['green'])
+    fig13.update_layout(template='plotly_white', width=800, height=400)
+    return [fig13]
+
+@tab("Top Artists and Songs", "Top Songs", columns=['Track Name', 'Popularity'],
+     description="**Top 10 Songs:** Lists top songs.")
+def top_songs(sel):
+    top_songs = sel.top('Popularity', 10)[['Track Name', 'Popularity']]
+    fig14 = px.bar(top_songs, y='Track Name', x='Popularity', orientation='h', title='Top 10 Songs by Popularity', color_discrete_sequence=['blue'])
+    fig14.update_layout(template='plotly_white', width=800, height=400)
+    return [fig14]
+
 
-def generate_popularity_trends(df):
-    st.header("Popularity Trends Over Time")
-    tab1, tab2, tab3 = st.tabs(["Average Popularity", "Individual Songs", "Top 10 Songs"])
-    
-    with tab1:
-        st.markdown("**Average Popularity by Decade:** This chart shows how the average popularity of songs has changed over different decades.")
-        if 'Decade' in df.columns:
-            top_decades = df.groupby('Decade')['Popularity'].mean().reset_index().nlargest(10, 'Popularity')
-            
-            fig1 = go.Figure()
-            fig1.add_trace(go.Scatter(
-                x=top_decades['Decade'],
-                y=top_decades['Popularity'],
-                mode='lines+markers',
-                fill='tonexty',
-                line=dict(color='royalblue', width=3),
-                marker=dict(size=8, color='darkblue', line=dict(width=2, color='white')),
-                name='Popularity',
-                hovertext=top_decades['Decade']
-            ))
-            fig1.update_layout(
-                title='Top 10 Decades by Average Popularity',
-                xaxis_title='Decade',
-                yaxis_title='Average Popularity Score',
-                template='plotly_white',
-                width=900,
-                height=450
-            )
-            st.plotly_chart(fig1)
-        else:
-            st.error("Cannot plot: 'Decade' column missing.")
-    
-    with tab2:
-        st.markdown("**Top 10 Individual Songs:** This scatter plot highlights the popularity of the top 10 most popular songs over time.")
-        if 'Year' in df.columns:
-            top_songs = df.nlargest(10, 'Popularity')
-            fig2 = px.scatter(
-                top_songs, x='Year', y='Popularity',
-                color='Popularity',
-                size='Popularity',
-                color_continuous_scale='viridis',
-                title='Top 10 Individual Songs by Popularity',
-                hover_data=['Track Name', 'Artist Name(s)', 'Year']
-            )
-            fig2.update_layout(
-                xaxis_title='Release Year',
-                yaxis_title='Popularity Score',
-                template='plotly_white',
-                width=900,
-                height=500
-            )
-            st.plotly_chart(fig2)
-        else:
-            st.error("Cannot plot: 'Year' column missing.")
-    
-    with tab3:
-        st.markdown("**Top 10 Most Popular Songs:** This bar chart displays the top 10 songs based on their popularity scores.")
-        if 'Track Name' in df.columns and 'Popularity' in df.columns:
-            top_songs = df.nlargest(10, 'Popularity')[['Track Name', 'Artist Name(s)', 'Popularity']]
-            fig3 = px.bar(
-                top_songs, y='Track Name', x='Popularity',
-                orientation='h', color='Popularity',
-                color_continuous_scale='deep',
-                title='Top 10 Most Popular Songs',
-                labels={'Track Name': 'Song Title', 'Popularity': 'Popularity Score'},
-                hover_data=['Track Name', 'Artist Name(s)']
-            )
-            fig3.update_layout(
-                xaxis_title='Popularity Score',
-                yaxis_title='Song Title',
-                template='plotly_white',
-                width=900,
-                height=500
-            )
-            st.plotly_chart(fig3)
-        else:
-            st.error("Cannot plot: 'Track Name' or 'Popularity' column missing.")
-
-
-def generate_audio_features(df):
-    st.header("Audio Features Analysis")
-    feature = st.selectbox(
-        "Select Feature", ['Danceability', 'Energy', 'Tempo', 'Loudness']
+view("Album Release Trends", "**Album Trends:** Shows release patterns.")
+
+@tab("Album Release Trends", "Albums per Year", columns=['Year'],
+     description="**Albums per Year:** Tracks release patterns.")
+def releases_per_year(sel):
+    albums_per_year = sel.count('Year', name='count')
+    fig15 = px.line(albums_per_year, x='Year', y='count', title='Number of Albums Released per Year', color_discrete_sequence=['purple'])
+    fig15.update_layout(template='plotly_white', width=800, height=400)
+    return [fig15]
+
+def heatmap_controls(sel):
+    c1, c2 = st.columns(2)
+    top_n = c1.slider("Most Active Artists", min_value=5, max_value=100, value=25, step=5)
+    bucket = c2.selectbox("Years per Column", [1, 2, 5, 10])
+    return {'top_n': top_n, 'bucket': bucket}
+
+@tab("Album Release Trends", "Artist-Year Heatmap", columns=['Artist Name(s)', 'Year'], controls=heatmap_controls,
+     defaults={'top_n': 25, 'bucket': 1},
+     description="**Songs by Artists and Years:** Visualizes trends.")
+def artist_year_heatmap(sel, top_n, bucket):
+    from models.sparse_counts import value_bucket_counts
+
+    artist_year = value_bucket_counts(
+        sel.catalog.artists, sel.catalog.df['Year'].to_numpy(), sel.rows, top_n=top_n, bucket=bucket
     )
-    tab1, tab2 = st.tabs(["Distribution", "By Decade"])
-    
-    with tab1:
-        st.markdown(f"**Top 20 {feature} Values:** This histogram displays the distribution of the top 20 songs based on {feature}.")
-        top_features = df.nlargest(20, feature)
-        fig = px.histogram(
-            top_features, x=feature, nbins=20,
-            color='Decade' if 'Decade' in df.columns else None,
-            barmode='overlay',
-            opacity=0.7,
-            title=f'Top 20 Songs by {feature}',
-            color_discrete_sequence=px.colors.qualitative.Set2,
-            hover_data=['Track Name', 'Artist Name(s)']
-        )
-        st.plotly_chart(fig)
-    
-    with tab2:
-        st.markdown(f"**{feature} by Decade:** This box plot compares the top 20 {feature} values across different decades.")
-        if 'Decade' in df.columns:
-            top_features = df.nlargest(20, feature)
-            fig2 = px.box(top_features, x='Decade', y=feature,
-                          color='Decade',
-                          title=f'Top 20 {feature} Values by Decade',
-                          color_discrete_sequence=px.colors.qualitative.Pastel,
-                          hover_data=['Track Name', 'Artist Name(s)']
-                          )
-            st.plotly_chart(fig2)
-        else:
-            st.error("Cannot plot: 'Decade' column missing.")
-def generate_genre_analysis(df):
-    st.header("Genre & Artist Analysis")
-    tab1, tab2, tab3 = st.tabs(["Top Genres", "Genre Distribution", "Artist Popularity"])
-    
-    with tab1:
-        st.markdown("**Top Genres in Top 10 Songs:** Displays the most common genres among the top 10 most popular songs.")
-        top_songs = df.nlargest(10, 'Popularity')
-        top_genres = top_songs.explode('Genres')['Genres'].value_counts().reset_index()
-        fig1 = px.bar(
-            top_genres, x='count', y='Genres',
-            orientation='h', color='count',
-            color_continuous_scale='viridis',
-            title='Top Genres in Top 10 Songs',
-            labels={'count': 'Number of Songs', 'Genres': 'Genre Name'},
-            hover_data=['Genres', 'count']
-        )
-        fig1.update_layout(template='plotly_white', width=900, height=500)
-        st.plotly_chart(fig1)
-    
-    with tab2:
-        st.markdown("**Genre Distribution in Top 10 Songs:** Shows how different genres contribute to the top 10 songs.")
-        genre_song_data = top_songs.explode('Genres')
-        fig2 = px.bar(
-            genre_song_data, x='Track Name', y='Popularity', color='Genres',
-            title='Genre Distribution in Top 10 Songs',
-            labels={'Track Name': 'Song Title', 'Popularity': 'Popularity Score', 'Genres': 'Genre'},
-            barmode='stack',
-            hover_data=['Track Name', 'Genres']
-        )
-        fig2.update_layout(template='plotly_white', width=900, height=500)
-        st.plotly_chart(fig2)
-    
-    with tab3:
-        st.markdown("**Artist Popularity in Top 10 Songs:** Visualizes the most popular artists in the top 10 songs with their song count and names.")
-        artist_popularity = top_songs.groupby('Artist Name(s)').agg({'Popularity': 'sum', 'Track Name': lambda x: list(x)}).reset_index().sort_values(by='Popularity', ascending=False)
-        artist_popularity['Song Count'] = artist_popularity['Track Name'].apply(len)
-        fig3 = px.bar(
-            artist_popularity, x='Popularity', y='Artist Name(s)',
-            orientation='h', color='Popularity',
-            color_continuous_scale='blues',
-            title='Artist Popularity in Top 10 Songs',
-            labels={'Artist Name(s)': 'Artist Name', 'Popularity': 'Total Popularity Score', 'Song Count': 'Number of Songs'},
-            hover_data={'Artist Name(s)': True, 'Popularity': True, 'Song Count': True, 'Track Name': True}
-        )
-        fig3.update_layout(template='plotly_white', width=900, height=500)
-        st.plotly_chart(fig3)
-
-def generate_explicit_trends(df):
-    st.header("Explicit Content Trends")
-    st.markdown("**Explicit vs Non-Explicit Songs Over Time:** This line chart shows how the number of explicit and non-explicit songs has changed over different decades.")
-    if 'Decade' in df.columns and 'Explicit' in df.columns:
-        explicit_trends = df.groupby(['Decade', 'Explicit']).size().reset_index(name='Count')
-        fig = px.line(
-            explicit_trends, x='Decade', y='Count', color='Explicit',
-            markers=True, line_shape='linear',
-            title='Explicit vs Non-Explicit Songs Over Time',
-            labels={'Decade': 'Decade', 'Count': 'Number of Songs', 'Explicit': 'Song Type'},
-            color_discrete_map={True: 'purple', False: 'green'}
-        )
-        fig.update_layout(template='plotly_white', width=900, height=500)
-        st.plotly_chart(fig)
+    fig16 = px.imshow(artist_year, title='Songs Released by Artists Across Years', color_continuous_scale='Viridis',
+                      labels=dict(x='Year', y='Artist', color='Songs'), aspect='auto')
+    fig16.update_layout(width=800, height=max(400, 18 * len(artist_year)))
+    return [fig16]
+
+
+view("Track Duration Analysis", "**Duration Analysis:** Displays track durations.")
+
+def duration_controls(sel):
+    return {'fidelity': fidelity_control("duration_fidelity")}
+
+@tab("Track Duration Analysis", "Distribution", columns=['Track Duration (ms)'], controls=duration_controls,
+     defaults={'fidelity': 'Medium'},
+     description="**Track Duration Distribution:** Shows duration lengths.")
+def duration_distribution(sel, fidelity):
+    fig17 = selection_histogram(sel, 'Track Duration (ms)', 'Distribution of Track Durations', 'orange', fidelity)
+    fig17.update_layout(template='plotly_white', width=800, height=400)
+    return [fig17]
+
+@tab("Track Duration Analysis", "By Decade", columns=['Decade', 'Track Duration (ms)'], controls=duration_controls,
+     defaults={'fidelity': 'Medium'},
+     description="**Duration by Decade:** Compares durations.")
+def duration_by_decade(sel, fidelity):
+    fig18 = selection_box(sel, 'Track Duration (ms)', 'Track Duration by Decade', 'green', fidelity)
+    fig18.update_layout(template='plotly_white', width=800, height=400)
+    return [fig18]
+
+
+view("Streaming and Engagement Insights", "**Streaming Insights:** Explores engagement trends.")
+
+def streaming_controls(sel):
+    return {'fidelity': fidelity_control("streaming_fidelity")}
+
+@tab("Streaming and Engagement Insights", "Popularity vs Duration", columns=['Track Duration (ms)', 'Popularity'],
+     controls=streaming_controls, defaults={'fidelity': 'Medium'},
+     description="**Popularity vs Duration:** Explores engagement trends.")
+def popularity_vs_duration(sel, fidelity):
+    fig19 = density_scatter(sel.frame(['Track Duration (ms)', 'Popularity']), 'Track Duration (ms)', 'Popularity', 'Popularity vs Track Duration', 'blue', fidelity)
+    fig19.update_layout(template='plotly_white', width=800, height=400)
+    return [fig19]
+
+@tab("Streaming and Engagement Insights", "Time Signature", columns=['Time Signature', 'Popularity'],
+     description="**Popularity by Time Signature:** Compares popularity.")
+def popularity_by_time_signature(sel):
+    pop_by_time = sel.mean(['Popularity'], by='Time Signature')
+    fig20 = px.bar(pop_by_time, x='Time Signature', y='Popularity', title='Average Popularity by Time Signature', color_discrete_sequence=['purple'])
+    fig20.update_layout(template='plotly_white', width=800, height=400)
+    return [fig20]
+
+
+view("Feature Comparisons Across Decades", "**Feature Comparisons:** Compares features across decades.")
+
+@tab("Feature Comparisons Across Decades", "Feature Comparison", columns=['Decade', 'Danceability', 'Energy', 'Valence'],
+     description="**Feature Comparison:** Compares features across decades; error bars show one standard deviation.")
+def feature_comparison(sel):
+    features = ['Danceability', 'Energy', 'Valence']
+    means = sel.mean(features, by='Decade').melt(id_vars='Decade')
+    spread = sel.std(features, by='Decade').melt(id_vars='Decade', value_name='std')
+    fig21 = px.bar(means.merge(spread, on=['Decade', 'variable']), x='Decade', y='value', color='variable', error_y='std',
+                   barmode='group', title='Feature Comparison by Decade', color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig21.update_layout(template='plotly_white', width=800, height=400)
+    return [fig21]
+
+@tab("Feature Comparisons Across Decades", "Loudness Trends", columns=['Year', 'Loudness'],
+     description="**Loudness Over Time:** Tracks loudness trends.")
+def loudness_trends(sel):
+    loudness_by_year = sel.mean(['Loudness'], by='Year')
+    fig22 = px.line(loudness_by_year, x='Year', y='Loudness', title='Average Loudness Over Time', color_discrete_sequence=['green'])
+    fig22.update_layout(template='plotly_white', width=800, height=400)
+    return [fig22]
+
+
+view("Network Analysis", "**Network Analysis:** Visualizes artist and genre connections.")
+
+def collaboration_controls(sel):
+    from models.network import collaboration_graph
+
+    graph = collaboration_graph(sel.catalog.version, sel.key, sel.catalog.artists, sel.rows)
+    if len(graph) == 0:
+        return {'min_weight': 1, 'top_n': 10}
+    c1, c2 = st.columns(2)
+    min_weight = c1.slider("Minimum Shared Tracks", min_value=1, max_value=max(int(graph.weight.max()), 2), value=1)
+    top_n = c2.slider("Artists to Show", min_value=10, max_value=max(min(len(graph), 2000), 10), value=min(len(graph), 150), step=10)
+    return {'min_weight': min_weight, 'top_n': top_n}
+
+@tab("Network Analysis", "Artist Collaborations", columns=['Artist Name(s)'], controls=collaboration_controls,
+     defaults={'min_weight': 1, 'top_n': 150},
+     description="**Artist Collaborations:** Visualizes artist connections.")
+def artist_collaborations(sel, min_weight, top_n):
+    from models.network import cached_layout, collaboration_graph
+
+    graph = collaboration_graph(sel.catalog.version, sel.key, sel.catalog.artists, sel.rows)
+    if len(graph) == 0:
+        return [Notice('warning', "No artist collaborations to display.")]
+    outputs = [graph.summary()]
+    shown = graph.prune(min_weight=min_weight, top_n=top_n)
+    if len(shown) > 0:
+        pos = cached_layout(shown.key, shown)
+        # Edges as one trace, segments separated by NaN gaps
+        gap = np.full(shown.n_edges, np.nan)
+        edge_x = np.column_stack([pos[shown.src, 0], pos[shown.dst, 0], gap]).ravel()
+        edge_y = np.column_stack([pos[shown.src, 1], pos[shown.dst, 1], gap]).ravel()
+        trace = go.Scattergl if len(shown) > 500 else go.Scatter
+        edge_trace = trace(
+            x=edge_x, y=edge_y,
+            line=dict(width=0.5, color='#888'),
+            hoverinfo='none',
+            mode='lines')
+
+        # Only the best-connected artists get a text label; the rest are hover-only
+        labelled = np.zeros(len(shown), dtype=bool)
+        labelled[np.argsort(-shown.strength, kind='stable')[:NETWORK_LABELS]] = True
+        node_trace = trace(
+            x=pos[:, 0], y=pos[:, 1],
+            mode='markers+text',
+            hoverinfo='text',
+            hovertext=[f"{name}<br>{deg} collaborators" for name, deg in zip(shown.labels, shown.degree)],
+            marker=dict(size=6 + 14 * np.sqrt(shown.degree / shown.degree.max()), color='red'),
+            text=np.where(labelled, shown.labels.to_numpy(), ''),
+            textposition="top center")
+
+        fig = go.Figure(data=[edge_trace, node_trace],
+                        layout=go.Layout(
+            title='Artist Collaborations',
+            showlegend=False,
+            hovermode='closest',
+            margin=dict(b=0, l=0, r=0, t=40),
+            xaxis=dict(visible=False), yaxis=dict(visible=False),
+            width=800, height=600))
+        outputs.append(fig)
+    else:
+        outputs.append(Notice('warning', "No collaborations pass the current thresholds."))
+    outputs += ["**Most Connected Artists:** Ranked by number of distinct collaborators.", graph.top_nodes(10)]
+    return outputs
+
+CROSSOVER_MEASURES = {'Shared Tracks': 'count', 'Jaccard': 'jaccard'}
+
+def crossover_controls(sel):
+    c1, c2 = st.columns(2)
+    top_n = c1.slider("Genres to Show", min_value=5, max_value=80, value=25, step=5)
+    measure = c2.radio("Measure", list(CROSSOVER_MEASURES), horizontal=True,
+                       help="Jaccard divides shared tracks by the tracks holding either genre.")
+    return {'top_n': top_n, 'measure': CROSSOVER_MEASURES[measure]}
+
+@tab("Network Analysis", "Genre Crossover", columns=['Artist Genres'], controls=crossover_controls,
+     defaults={'top_n': 25, 'measure': 'count'},
+     description="**Genre Crossover:** How often genres share a track, among the {top_n} genres with the most crossover.")
+def genre_crossover(sel, top_n, measure):
+    from models.cooccurrence import genre_cooccurrence
+
+    matrix = genre_cooccurrence(sel.catalog.version, sel.key, sel.catalog.genres, sel.rows)
+    if matrix.n_pairs == 0:
+        return [Notice('warning', "No tracks with more than one genre to display.")]
+    adjacency = matrix.adjacency(top_n, measure)
+    label = 'Shared Tracks' if measure == 'count' else 'Jaccard'
+    fig = px.imshow(adjacency, color_continuous_scale='Viridis', labels=dict(color=label), aspect='equal',
+                    title='Genre Co-occurrence')
+    fig.update_xaxes(tickangle=45)
+    fig.update_layout(width=800, height=800)
+    return [matrix.summary(), fig, "**Top Genre Pairs:** Ranked by shared tracks.", matrix.top_pairs(15)]
+
+
+view("Similar Tracks", "**Similar Tracks:** Finds sound-alikes by audio features.")
+
+SIMILAR_CANDIDATES = 50
+SIMILAR_SHOWN_IN_CHART = 5
+# Track and artist names taken from the search index per query; names are
+# ranked catalog-wide, so more are looked up than candidates are shown
+SIMILAR_SEARCH_NAMES = 200
+
+def similar_candidates(sel, query):
+    # Up to SIMILAR_CANDIDATES tracks to pick from, most popular first. A
+    # query is looked up in the catalog's search index and its track and
+    # artist names are turned into rows of this selection by the filter index.
+    if not query:
+        return sel.top('Popularity', SIMILAR_CANDIDATES)
+    catalog = sel.catalog
+    found = catalog.search_index.search(query, SIMILAR_SEARCH_NAMES)
+    rows = [np.zeros(0, dtype=np.int64)]
+    for kind in ('Track', 'Artist'):
+        names = tuple(found.loc[found['Kind'] == kind, 'Name'])
+        if names:
+            rows.append(catalog.filter_index.rows(sel.decades, sel.filters + ((SEARCH_KINDS[kind], names),)))
+    rows = np.unique(np.concatenate(rows))
+    values = pd.to_numeric(catalog.df['Popularity'], errors='coerce').to_numpy(dtype='float64')[rows]
+    keep = ~np.isnan(values)
+    rows, values = rows[keep], values[keep]
+    return catalog.df.iloc[rows[np.lexsort((rows, -values))[:SIMILAR_CANDIDATES]]]
+
+def similar_controls(sel):
+    query = st.text_input("Find a Track", placeholder="Track or artist name").strip()
+    candidates = similar_candidates(sel, query)
+    c1, c2 = st.columns([3, 1])
+    if candidates.empty:
+        c1.info(f"No track in the current selection matches '{query}'.")
+        track = None
     else:
-        st.error("Cannot plot: 'Decade' or 'Explicit' column missing.")
-
-def generate_album_insights(df):
-    st.header("Album & Label Insights")
-    tab1, tab2 = st.tabs(["Top Labels", "Album Popularity"])
-    
-    with tab1:
-        st.markdown("**Top Record Labels:** Displays the most dominant record labels based on the number of songs they have released.")
-        if 'Label' in df.columns:
-            top_labels = df['Label'].value_counts().nlargest(10).reset_index()
-            fig9 = px.sunburst(
-                top_labels, path=['Label'], values='count',
-                title='Top Record Labels by Song Count',
-                color='count', color_continuous_scale='blues',
-                labels={'Label': 'Record Label', 'count': 'Number of Songs'}
-            )
-            fig9.update_layout(template='plotly_white', width=900, height=500)
-            st.plotly_chart(fig9)
-        else:
-            st.error("Cannot plot: 'Label' column missing.")
-    
-    with tab2:
-        st.markdown("**Album Popularity:** Compares the popularity of albums based on the number of songs and their average popularity score.")
-        if 'Album Name' in df.columns and 'Popularity' in df.columns:
-            album_pop = df.groupby('Album Name')['Popularity'].agg(['mean', 'count']).reset_index()
-            album_pop = album_pop.sort_values(by=['mean', 'count'], ascending=[False, False]).nlargest(10, 'mean')
-            fig10 = px.strip(
-                album_pop, x='mean', y='Album Name',
-                color='count',
-                title='Top 10 Albums by Popularity',
-                labels={'Album Name': 'Album', 'mean': 'Average Popularity Score', 'count': 'Number of Songs'},
-                hover_data={'Album Name': True, 'count': True, 'mean': True},
-                color_discrete_sequence=px.colors.qualitative.Pastel
-            )
-            fig10.update_layout(template='plotly_white', width=900, height=500)
-            st.plotly_chart(fig10)
-        else:
-            st.error("Cannot plot: 'Album Name' or 'Popularity' column missing.")
-
-
-def generate_tempo_mood(df):
-    st.header("Tempo & Mood Analysis")
-    tab1, tab2 = st.tabs(["Tempo Trends", "Mood Scatter"])
-    with tab1:
-        st.markdown("**Tempo Trends:** Tracks tempo changes.")
-        if 'Year' in df.columns and 'Tempo' in df.columns:
-            tempo_by_year = df.groupby('Year')['Tempo'].mean().reset_index()
-            fig11 = px.line(tempo_by_year, x='Year', y='Tempo', title='Average Tempo Over Time', color_discrete_sequence=['orange'])
-            fig11.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig11)
-        else:
-            st.error("Cannot plot: 'Year' or 'Tempo' column missing.")
-    with tab2:
-        st.markdown("**Mood Analysis (Valence & Energy):** Categorizes songs based on mood and energy.")
-        if 'Valence' in df.columns and 'Energy' in df.columns:
-            top_songs = df.nlargest(10, 'Popularity')
-            mood_by_valence = top_songs.groupby('Valence')['Energy'].mean().reset_index()
-            fig12 = px.bar(
-                mood_by_valence, x='Valence', y='Energy',
-                title='Average Energy Levels by Valence (Mood Analysis)',
-                color='Energy', color_continuous_scale='plasma'
-            )
-            fig12.update_layout(template='plotly_white', width=900, height=500)
-            st.plotly_chart(fig12)
-        else:
-            st.error("Cannot plot: 'Valence' or 'Energy' column missing.")
-def generate_top_artists_songs(df):
-    st.header("Top Artists and Songs")
-    tab1, tab2 = st.tabs(["Top Artists", "Top Songs"])
-    with tab1:
-        st.markdown("**Most Featured Artists:** Shows top artists.")
-        if 'Artist Name(s)' in df.columns:
-            top_artists = df['Artist Name(s)'].value_counts().nlargest(10).reset_index()
-            fig13 = px.bar(top_artists, x='Artist Name(s)', y='count', title='Most Featured Artists', color_discrete_sequence=['green'])
-            fig13.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig13)
-        else:
-            st.error("Cannot plot: 'Artist Name(s)' column missing.")
-    with tab2:
-        st.markdown("**Top 10 Songs:** Lists top songs.")
-        if 'Track Name' in df.columns and 'Popularity' in df.columns:
-            top_songs = df.nlargest(10, 'Popularity')[['Track Name', 'Popularity']]
-            fig14 = px.bar(top_songs, y='Track Name', x='Popularity', orientation='h', title='Top 10 Songs by Popularity', color_discrete_sequence=['blue'])
-            fig14.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig14)
-        else:
-            st.error("Cannot plot: 'Track Name' or 'Popularity' column missing.")
-
-def generate_album_release_trends(df):
-    st.header("Album Release Trends")
-    tab1, tab2 = st.tabs(["Albums per Year", "Artist-Year Heatmap"])
-    with tab1:
-        st.markdown("**Albums per Year:** Tracks release patterns.")
-        if 'Year' in df.columns:
-            albums_per_year = df['Year'].value_counts().sort_index().reset_index()
-            fig15 = px.line(albums_per_year, x='Year', y='count', title='Number of Albums Released per Year', color_discrete_sequence=['purple'])
-            fig15.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig15)
-        else:
-            st.error("Cannot plot: 'Year' column missing.")
-    with tab2:
-        st.markdown("**Songs by Artists and Years:** Visualizes trends.")
-        if 'Artist Name(s)' in df.columns and 'Year' in df.columns:
-            artist_year = df.groupby(['Artist Name(s)', 'Year']).size().unstack().fillna(0)
-            fig16 = px.imshow(artist_year, title='Songs Released by Artists Across Years', color_continuous_scale='Viridis')
-            fig16.update_layout(width=800, height=400)
-            st.plotly_chart(fig16)
-        else:
-            st.error("Cannot plot: 'Artist Name(s)' or 'Year' column missing.")
-
-def generate_duration_analysis(df):
-    st.header("Track Duration Analysis")
-    tab1, tab2 = st.tabs(["Distribution", "By Decade"])
-    with tab1:
-        st.markdown("**Track Duration Distribution:** Shows duration lengths.")
-        if 'Track Duration (ms)' in df.columns:
-            fig17 = px.histogram(df, x='Track Duration (ms)', title='Distribution of Track Durations', color_discrete_sequence=['orange'])
-            fig17.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig17)
-        else:
-            st.error("Cannot plot: 'Track Duration (ms)' column missing.")
-    with tab2:
-        st.markdown("**Duration by Decade:** Compares durations.")
-        if 'Decade' in df.columns and 'Track Duration (ms)' in df.columns:
-            fig18 = px.box(df, x='Decade', y='Track Duration (ms)', title='Track Duration by Decade', color_discrete_sequence=['green'])
-            fig18.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig18)
-        else:
-            st.error("Cannot plot: 'Decade' or 'Track Duration (ms)' column missing.")
-
-def generate_streaming_insights(df):
-    st.header("Streaming and Engagement Insights")
-    tab1, tab2 = st.tabs(["Popularity vs Duration", "Time Signature"])
-    with tab1:
-        st.markdown("**Popularity vs Duration:** Explores engagement trends.")
-        if 'Track Duration (ms)' in df.columns and 'Popularity' in df.columns:
-            fig19 = px.scatter(df, x='Track Duration (ms)', y='Popularity', title='Popularity vs Track Duration', color_discrete_sequence=['blue'])
-            fig19.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig19)
-        else:
-            st.error("Cannot plot: 'Track Duration (ms)' or 'Popularity' column missing.")
-    with tab2:
-        st.markdown("**Popularity by Time Signature:** Compares popularity.")
-        if 'Time Signature' in df.columns and 'Popularity' in df.columns:
-            pop_by_time = df.groupby('Time Signature')['Popularity'].mean().reset_index()
-            fig20 = px.bar(pop_by_time, x='Time Signature', y='Popularity', title='Average Popularity by Time Signature', color_discrete_sequence=['purple'])
-            fig20.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig20)
-        else:
-            st.error("Cannot plot: 'Time Signature' or 'Popularity' column missing.")
-
-def generate_feature_comparisons(df):
-    st.header("Feature Comparisons Across Decades")
-    tab1, tab2 = st.tabs(["Feature Comparison", "Loudness Trends"])
-    with tab1:
-        st.markdown("**Feature Comparison:** Compares features across decades.")
-        if 'Decade' in df.columns:
-            features_by_decade = df.groupby('Decade')[['Danceability', 'Energy', 'Valence']].mean().reset_index()
-            fig21 = px.bar(features_by_decade.melt(id_vars='Decade'), x='Decade', y='value', color='variable',
-                           barmode='group', title='Feature Comparison by Decade', color_discrete_sequence=px.colors.qualitative.Pastel)
-            fig21.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig21)
-        else:
-            st.error("Cannot plot: 'Decade' column missing.")
-    with tab2:
-        st.markdown("**Loudness Over Time:** Tracks loudness trends.")
-        if 'Year' in df.columns and 'Loudness' in df.columns:
-            loudness_by_year = df.groupby('Year')['Loudness'].mean().reset_index()
-            fig22 = px.line(loudness_by_year, x='Year', y='Loudness', title='Average Loudness Over Time', color_discrete_sequence=['green'])
-            fig22.update_layout(template='plotly_white', width=800, height=400)
-            st.plotly_chart(fig22)
-        else:
-            st.error("Cannot plot: 'Year' or 'Loudness' column missing.")
-
-def generate_network_analysis(df):
-    st.header("Network Analysis")
-    tab1, tab2 = st.tabs(["Artist Collaborations", "Genre Crossover"])
-    with tab1:
-        st.markdown("**Artist Collaborations:** Visualizes artist connections.")
-        if 'Artist Name(s)' in df.columns:
-            valid_artists = df['Artist Name(s)'].dropna().astype(str)
-            G = nx.Graph()
-            for artists in valid_artists:
-                artists_list = [a.strip() for a in artists.split(',') if a.strip()]
-                if len(artists_list) > 1:
-                    for a1, a2 in combinations(artists_list, 2):
-                        G.add_edge(a1, a2)
-            if G.number_of_nodes() > 0:
-                pos = nx.spring_layout(G)
-                edge_x = []
-                edge_y = []
-                for edge in G.edges():
-                    x0, y0 = pos[edge[0]]
-                    x1, y1 = pos[edge[1]]
-                    edge_x.extend([x0, x1, None])
-                    edge_y.extend([y0, y1, None])
-
-                edge_trace = go.Scatter(
-                    x=edge_x, y=edge_y,
-                    line=dict(width=0.5, color='#888'),
-                    hoverinfo='none',
-                    mode='lines')
-
-                node_x = [pos[node][0] for node in G.nodes()]
-                node_y = [pos[node][1] for node in G.nodes()]
-                node_trace = go.Scatter(
-                    x=node_x, y=node_y,
-                    mode='markers+text',
-                    hoverinfo='text',
-                    marker=dict(size=10, color='red'),
-                    text=list(G.nodes()),
-                    textposition="top center")
-
-                fig = go.Figure(data=[edge_trace, node_trace],
-                                layout=go.Layout(
-                    title='Artist Collaborations',
-                    showlegend=False,
-                    hovermode='closest',
-                    margin=dict(b=0, l=0, r=0, t=40),
-                    width=800, height=600))
-                st.plotly_chart(fig)
-            else:
-                st.warning("No artist collaborations to display.")
-        else:
-            st.error("Cannot plot: 'Artist Name(s)' column missing.")
-    with tab2:
-        st.markdown("**Genre Crossover:** Placeholder for future visualization.")
-        st.write("To implement, install `holoviews` and use the following code:")
-        st.code("""
-        import holoviews as hv
-        hv.extension('bokeh')
-        genre_pairs = df.explode('Genres')[['Genres']].merge(df.explode('Genres')[['Genres']], how='cross')
-        chord_data = genre_pairs.groupby(['Genres_x', 'Genres_y']).size().reset_index(name='value')
-        chord = hv.Chord(chord_data).opts(title="Genre Crossover")
-        st.write(hv.render(chord, backend='bokeh'))
-        """)
\ No newline at end of file
+        # Label -> row id; a repeated label (a re-release) keeps its most popular row
+        rows = {}
+        for row, name, artist, year in zip(candidates.index, candidates['Track Name'], candidates['Artist Name(s)'], candidates['Year']):
+            rows.setdefault(f"{name} - {artist} ({year})", row)
+        track = rows[c1.selectbox("Track", list(rows))]
+    k = c2.slider("Neighbours", min_value=5, max_value=50, value=10, step=5)
+    return {'track': None if track is None else int(track), 'k': k}
+
+@tab("Similar Tracks", "Sound-alikes", columns=['Track Name', 'Artist Name(s)', 'Popularity', 'Year'] + FEATURE_COLUMNS,
+     controls=similar_controls, defaults={'track': None, 'k': 10},
+     description="**Sound-alikes:** The {k} tracks in the current selection closest to the chosen one in "
+                 "danceability, energy, tempo, loudness and valence, each scaled to unit variance.")
+def similar_tracks(sel, track, k):
+    index = sel.catalog.features
+    if track is None:
+        # The most popular track of the selection, as the picker shows first
+        top = sel.top('Popularity', 1)
+        track = int(top.index[0]) if len(top) else None
+    if index is None or track is None or index.vector(track) is None:
+        return [Notice('warning', "Pick a track with all audio features to find similar tracks.")]
+    rows, distances = index.neighbours(track, k, sel.decades, rows=None if sel.decade_only else sel.rows)
+    columns = ['Track Name', 'Artist Name(s)', 'Year', 'Popularity'] + FEATURE_COLUMNS
+    picked = sel.catalog.df.iloc[[track]][columns]
+    similar = sel.catalog.df.iloc[rows][columns].assign(Distance=np.round(distances, 3))
+
+    # Standardized features of the track and its nearest few, side by side
+    shown = np.concatenate([[track], rows[:SIMILAR_SHOWN_IN_CHART]])
+    scores = pd.DataFrame(
+        np.vstack([index.vector(row) for row in shown]), columns=FEATURE_COLUMNS,
+        index=sel.catalog.df['Track Name'].iloc[shown].astype(str).to_numpy(),
+    )
+    scores.index = [f"{i}. {name}" if i else f"{name} (picked)" for i, name in enumerate(scores.index)]
+    fig = px.bar(scores.rename_axis('Track').reset_index().melt(id_vars='Track', var_name='Feature', value_name='Standard Score'),
+                 x='Feature', y='Standard Score', color='Track', barmode='group',
+                 title='Audio Features of the Track and Its Nearest Neighbours',
+                 color_discrete_sequence=px.colors.qualitative.Pastel)
+    fig.update_layout(template='plotly_white', width=900, height=450)
+    return [picked, fig, f"**{len(similar)} Most Similar Tracks:** Nearest first; distance is in standard deviations.", similar]
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+CUBE_MEASURES = ['Popularity', 'Danceability', 'Energy', 'Valence', 'Tempo', 'Loudness', 'Track Duration (ms)']
+CUBE_DIMENSIONS = ['Explicit', 'Time Signature']
+
+
+class AggregateCube:
+    # Row counts plus per-measure non-null counts, sums and sums of squares at
+    # Year x dimension grain. A decade selection only ever touches cube cells,
+    # so its cost depends on the number of years, not the number of tracks.
+
+    def __init__(self, cells, measures, dimensions):
+        self.cells = cells
+        self.measures = measures
+        self.dimensions = dimensions
+
+    @classmethod
+    def from_frame(cls, df):
+        measures = [m for m in CUBE_MEASURES if m in df.columns]
+        dimensions = [d for d in CUBE_DIMENSIONS if d in df.columns]
+        frame = pd.DataFrame({'rows': np.ones(len(df), dtype=np.int64)}, index=df.index)
+        for m in measures:
+            values = pd.to_numeric(df[m], errors='coerce').astype('float64')
+            frame[f'{m}|n'] = values.notna().astype(np.int64)
+            values = values.fillna(0)
+            frame[f'{m}|sum'] = values
+            frame[f'{m}|sumsq'] = values * values
+        keys = ['Year'] + dimensions
+        for k in keys:
+            frame[k] = df[k]
+        cells = frame.groupby(keys, dropna=False, observed=True, sort=True).sum().reset_index()
+        cells.insert(1, 'Decade', (cells['Year'] // 10 * 10).astype(cells['Year'].dtype))
+        return cls(cells, measures, dimensions)
+
+    def merge(self, other):
+        # Combine cubes of disjoint row sets (e.g. two ingest chunks)
+        keys = ['Year', 'Decade'] + self.dimensions
+        cells = pd.concat([self.cells, other.cells], ignore_index=True)
+        cells = cells.groupby(keys, dropna=False, observed=True, sort=True).sum().reset_index()
+        return AggregateCube(cells, self.measures, self.dimensions)
+
+    def _grouped(self, by, decades):
+        cells = self.cells if decades is None else self.cells[self.cells['Decade'].isin(decades)]
+        return cells.groupby(by, observed=True, sort=True)
+
+    def count(self, by, decades=None, name='Count'):
+        return self._grouped(by, decades)['rows'].sum().reset_index(name=name)
+
+    def mean(self, measures, by, decades=None):
+        sums = self._grouped(by, decades)[[f'{m}|{s}' for m in measures for s in ('n', 'sum')]].sum()
+        out = pd.DataFrame(index=sums.index)
+        for m in measures:
+            out[m] = sums[f'{m}|sum'] / sums[f'{m}|n'].replace(0, np.nan)
+        return out.reset_index()
+
+    def std(self, measures, by, decades=None):
+        sums = self._grouped(by, decades)[[f'{m}|{s}' for m in measures for s in ('n', 'sum', 'sumsq')]].sum()
+        out = pd.DataFrame(index=sums.index)
+        for m in measures:
+            n = sums[f'{m}|n'].where(sums[f'{m}|n'] > 1)
+            mean = sums[f'{m}|sum'] / n
+            # Sample standard deviation, matching pandas' default ddof=1
+            out[m] = np.sqrt(((sums[f'{m}|sumsq'] - n * mean * mean) / (n - 1)).clip(lower=0))
+        return out.reset_index()
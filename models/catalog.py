@@ -0,0 +1,310 @@
+from functools import cached_property, reduce
+from uuid import uuid4
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+from models.aggregates import AggregateCube
+from models.filters import FilterIndex, normalize_filters
+from models.multivalue import MultiValueColumn
+from models.search import SearchIndex
+from models.similarity import FeatureIndex
+from models.sketches import DistributionSketches
+from models.topk import TopKIndex
+
+# Source column -> catalog attribute for the comma-separated columns
+MULTI_VALUE_COLUMNS = {
+    'Artist Genres': ('genres', 'Unknown'),
+    'Artist Name(s)': ('artists', None),
+}
+# Source columns views only read through their encoded form; the raw
+# strings are dropped from `df` once encoded
+ENCODED_ONLY_COLUMNS = ['Artist Genres']
+
+
+def _concat(frames, sort_categories=True):
+    # pd.concat turns categoricals with differing categories into object, so
+    # union those columns separately to keep chunked ingest compact. Appends
+    # pass sort_categories=False: existing codes then stand and only the new
+    # rows are recoded against the categories they add.
+    # A column some frames lack (e.g. a dropped-in file without it) is
+    # filled with missing values of the dtype the others give it, so a
+    # categorical stays categorical.
+    columns = frames[0].columns.append([f.columns.difference(frames[0].columns, sort=False) for f in frames[1:]])
+    out = {}
+    for col in columns:
+        dtype = next(f[col].dtype for f in frames if col in f.columns)
+        if not isinstance(dtype, pd.CategoricalDtype):
+            dtype = None
+        parts = [f[col] if col in f.columns else pd.Series(np.nan, index=f.index, dtype=dtype) for f in frames]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            out[col] = pd.Series(union_categoricals(parts, sort_categories=sort_categories))
+        else:
+            out[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(out, copy=False)
+
+
+def _stack(frames):
+    frames = [f for f in frames if not f.empty]
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+class Catalog:
+    # The processed frame plus the indexes built from it. Row ids everywhere
+    # are positions in `df`, which always carries a RangeIndex.
+
+    def __init__(self, df, arrays=None, version=None, indexes=None, rejected=None):
+        # Identifies the data behind cached results; the source hash when known
+        self.version = version or uuid4().hex
+        # Source rows dropped during processing, kept so they can be reported
+        if rejected is None and arrays:
+            rejected = pd.DataFrame({
+                key[len('rejected.'):]: values.astype(object)
+                for key, values in arrays.items() if key.startswith('rejected.')
+            })
+        self.rejected = rejected if rejected is not None else pd.DataFrame()
+        # Prebuilt indexes (see from_chunks) are used as given
+        indexes = indexes or {}
+        for col, (attr, fill) in MULTI_VALUE_COLUMNS.items():
+            if attr in indexes:
+                encoded = indexes[attr]
+            elif arrays and f'{attr}.codes' in arrays:
+                encoded = MultiValueColumn.from_arrays(arrays, attr)
+            elif col in df.columns:
+                encoded = MultiValueColumn.from_strings(df[col], fill=fill)
+            else:
+                encoded = None
+            setattr(self, attr, encoded)
+        encoded_only = [c for c in ENCODED_ONLY_COLUMNS if c in df.columns]
+        self.df = df = df.drop(columns=encoded_only) if encoded_only else df
+        self.decades = sorted(df['Decade'].unique().tolist()) if 'Decade' in df.columns else []
+        for attr, index in (('cube', AggregateCube), ('topk', TopKIndex), ('sketches', DistributionSketches)):
+            if attr in indexes:
+                setattr(self, attr, indexes[attr])
+            else:
+                setattr(self, attr, index.from_frame(df) if self.decades else None)
+        if 'features' in indexes:
+            self.features = indexes['features']
+        else:
+            self.features = FeatureIndex.from_frame(df) if self.decades else None
+
+    @classmethod
+    def from_chunks(cls, chunks, version=None, rejected=None):
+        # Build from processed frames over consecutive row ranges, each
+        # indexed by its global row positions. Indexes are built per chunk and
+        # merged, so only one chunk's rows are ever worked on at a time.
+        # `rejected` is a list of frames the chunk reader fills as it goes.
+        frames, encoded, cubes, heads, sketches = [], {}, [], [], []
+        for chunk in chunks:
+            if chunk.empty:
+                continue
+            for col, (attr, fill) in MULTI_VALUE_COLUMNS.items():
+                if col in chunk.columns:
+                    encoded.setdefault(attr, []).append(MultiValueColumn.from_strings(chunk[col], fill=fill))
+            chunk = chunk.drop(columns=[c for c in ENCODED_ONLY_COLUMNS if c in chunk.columns])
+            frames.append(chunk)
+            if 'Decade' in chunk.columns:
+                cubes.append(AggregateCube.from_frame(chunk))
+                heads.append(TopKIndex.from_frame(chunk))
+                sketches.append(DistributionSketches.from_frame(chunk))
+        rejected = _stack(rejected or [])
+        if not frames:
+            return cls(pd.DataFrame(), version=version, rejected=rejected)
+        indexes = {attr: MultiValueColumn.concat(parts) for attr, parts in encoded.items()}
+        if cubes:
+            indexes['cube'] = reduce(AggregateCube.merge, cubes)
+            indexes['topk'] = reduce(TopKIndex.merge, heads)
+            indexes['sketches'] = DistributionSketches.combine(sketches)
+        return cls(_concat(frames), version=version, indexes=indexes, rejected=rejected)
+
+    def append(self, chunks, version=None, rejected=None):
+        # A new catalog with the rows of `chunks` (processed frames indexed
+        # from len(self.df)) after this one's. Only the new rows are parsed
+        # and indexed; the existing indexes are merged with theirs.
+        delta = Catalog.from_chunks(chunks, rejected=rejected)
+        rejected = _stack([self.rejected, delta.rejected])
+        if delta.df.empty:
+            if delta.rejected.empty:
+                return self
+            return Catalog(self.df, version=version, indexes=self._indexes(), rejected=rejected)
+        if self.df.empty:
+            return Catalog(delta.df, version=version, indexes=delta._indexes(), rejected=rejected)
+        indexes = {}
+        for attr, _ in MULTI_VALUE_COLUMNS.values():
+            mine, theirs = getattr(self, attr), getattr(delta, attr)
+            if mine is not None and theirs is not None:
+                indexes[attr] = MultiValueColumn.concat([mine, theirs])
+        if self.cube is not None and delta.cube is not None:
+            indexes['cube'] = self.cube.merge(delta.cube)
+            indexes['topk'] = self.topk.merge(delta.topk)
+            indexes['sketches'] = self.sketches.merge(delta.sketches)
+        if self.features is not None:
+            indexes['features'] = self.features.append(delta.df, start=len(self.df))
+        df = _concat([self.df, delta.df], sort_categories=False)
+        return Catalog(df, version=version, indexes=indexes, rejected=rejected)
+
+    def _indexes(self):
+        attrs = [attr for attr, _ in MULTI_VALUE_COLUMNS.values()] + ['cube', 'topk', 'sketches', 'features']
+        return {attr: getattr(self, attr) for attr in attrs if getattr(self, attr) is not None}
+
+    def to_arrays(self):
+        arrays = {}
+        for attr, _ in MULTI_VALUE_COLUMNS.values():
+            if getattr(self, attr) is not None:
+                arrays.update(getattr(self, attr).to_arrays(attr))
+        for col in self.rejected.columns:
+            arrays[f'rejected.{col}'] = self.rejected[col].fillna('').astype(str).to_numpy(dtype=str)
+        return arrays
+
+    @property
+    def columns(self):
+        # Columns of `df` plus the source columns held only encoded
+        encoded = [c for c in ENCODED_ONLY_COLUMNS if getattr(self, MULTI_VALUE_COLUMNS[c][0]) is not None]
+        return self.df.columns.append(pd.Index(encoded))
+
+    @cached_property
+    def all_rows(self):
+        # Row ids of a full selection, shared by every session
+        return np.arange(len(self.df))
+
+    @cached_property
+    def nbytes(self):
+        # Frame and encoded columns, counted once however many sessions read them
+        size = int(self.df.memory_usage(index=True, deep=True).sum())
+        for attr, _ in MULTI_VALUE_COLUMNS.values():
+            if getattr(self, attr) is not None:
+                size += getattr(self, attr).nbytes
+        if self.features is not None:
+            size += self.features.nbytes
+        return size
+
+    @cached_property
+    def filter_index(self):
+        return FilterIndex(self)
+
+    @cached_property
+    def search_index(self):
+        # Not built at load: it takes seconds on a multi-million-row catalog.
+        # The live catalog builds it in the background (see warm())
+        return SearchIndex.from_catalog(self)
+
+    def warm(self):
+        # Build the lazy indexes up front; the live catalog does this off the
+        # request thread before a catalog is swapped in
+        if not self.df.empty:
+            self.filter_index.warm()
+            self.search_index
+        return self
+
+    def select(self, decades, filters=None, highlight=None):
+        return Selection(self, decades, filters, highlight)
+
+
+class Selection:
+    # Decades plus optional column filters (see models.filters) over a
+    # catalog, held as row ids rather than a copy of the rows. Views call
+    # frame(columns) to gather only the columns they read, use `rows` to index
+    # into the catalog's encoded columns, count()/mean()/std() for grouped
+    # aggregates, top() for the largest values of a column and
+    # histogram()/box_stats()/outliers() for distributions. The per-decade
+    # indexes answer those for decade-only selections; with filters they run
+    # over `rows`.
+    # `highlight` names a track views may single out, e.g. a search result.
+
+    def __init__(self, catalog, decades, filters=None, highlight=None):
+        self.catalog = catalog
+        wanted = set(decades or catalog.decades)
+        self.decades = tuple(d for d in catalog.decades if d in wanted)
+        self.filters = normalize_filters(filters)
+        self.decade_only = not self.filters
+        self.is_full = self.decade_only and len(self.decades) == len(catalog.decades)
+        self.highlight = highlight
+        # Bytes copied out of the catalog for this selection, for the memory report
+        self.gathered = 0
+
+    @property
+    def key(self):
+        key = (self.decades, self.filters) if self.filters else self.decades
+        return key if self.highlight is None else (key, self.highlight)
+
+    @property
+    def columns(self):
+        return self.catalog.columns
+
+    # Grouped aggregates come from the catalog's cube rather than from `df`
+    def count(self, by, name='Count'):
+        if self.decade_only:
+            return self.catalog.cube.count(by, self.decades, name=name)
+        by = [by] if isinstance(by, str) else list(by)
+        return self.frame(by).groupby(by, observed=True, sort=True).size().reset_index(name=name)
+
+    def mean(self, measures, by):
+        if self.decade_only:
+            return self.catalog.cube.mean(measures, by, self.decades)
+        keys = [by] if isinstance(by, str) else list(by)
+        df = self.frame(keys + measures)
+        # float64 like the cube's sums
+        return df.astype({m: 'float64' for m in measures}).groupby(keys, observed=True, sort=True)[measures].mean().reset_index()
+
+    def std(self, measures, by):
+        if self.decade_only:
+            return self.catalog.cube.std(measures, by, self.decades)
+        keys = [by] if isinstance(by, str) else list(by)
+        df = self.frame(keys + measures)
+        return df.astype({m: 'float64' for m in measures}).groupby(keys, observed=True, sort=True)[measures].std().reset_index()
+
+    def top(self, column, k):
+        # Same rows as df.nlargest(k, column), merged from per-decade heads
+        rows = self.catalog.topk.top(column, k, self.decades) if self.decade_only else None
+        if rows is None:
+            values = pd.to_numeric(self.catalog.df[column], errors='coerce').to_numpy(dtype='float64')[self.rows]
+            keep = ~np.isnan(values)
+            rows, values = self.rows[keep], values[keep]
+            rows = rows[np.lexsort((rows, -values))[:k]]
+        return self.catalog.df.iloc[rows]
+
+    # Distributions merged from per-decade sketches; see models.sketches for error bounds
+    def has_sketch(self, column):
+        return self.decade_only and self.catalog.sketches is not None and self.catalog.sketches.has(column)
+
+    def histogram(self, column, bins):
+        return self.catalog.sketches.histogram(column, self.decades, bins)
+
+    def box_stats(self, column):
+        return self.catalog.sketches.box_stats(column, self.decades)
+
+    def outliers(self, column, limit):
+        return self.catalog.sketches.outliers(column, self.decades, limit)
+
+    @cached_property
+    def rows(self):
+        if self.is_full:
+            return self.catalog.all_rows
+        return self.catalog.filter_index.rows(self.decades, self.filters)
+
+    def highlighted(self, k):
+        # Up to k most popular rows of the highlighted track in this selection
+        if self.highlight is None:
+            return self.catalog.df.iloc[:0]
+        rows = self.catalog.filter_index.rows(self.decades, self.filters + (('Track Name', (self.highlight,)),))
+        values = pd.to_numeric(self.catalog.df['Popularity'].iloc[rows], errors='coerce').to_numpy(dtype='float64')
+        return self.catalog.df.iloc[rows[np.argsort(-values, kind='stable')[:k]]]
+
+    def frame(self, columns):
+        # The selected rows of `columns`. A full selection shares the
+        # catalog's arrays; otherwise only these columns are gathered.
+        df = self.catalog.df
+        if self.is_full:
+            return pd.DataFrame({c: df[c] for c in columns}, copy=False)
+        out = df.iloc[self.rows, df.columns.get_indexer(columns)]
+        self.gathered += int(out.memory_usage(index=False).sum())
+        return out
+
+    @property
+    def df(self):
+        # Every column; prefer frame() with the columns actually needed
+        return self.frame(list(self.catalog.df.columns))
+
+    @property
+    def nbytes(self):
+        return (0 if self.is_full else self.rows.nbytes) + self.gathered
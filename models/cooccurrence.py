@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import sparse
+
+
+class CoOccurrence:
+    # Symmetric value x value counts for a multi-valued column, from a sparse
+    # track x value incidence matrix X as XᵀX: the diagonal holds each value's
+    # track count, off-diagonal cells the tracks two values share. Memory
+    # follows the non-zero pairs, never the number of exploded rows squared.
+
+    def __init__(self, labels, matrix):
+        self.labels = labels
+        self.matrix = matrix
+        self.tracks = matrix.diagonal()
+        # Shared tracks with any other value; ranks values by crossover
+        self.strength = np.asarray(matrix.sum(axis=1)).ravel() - self.tracks
+
+    @classmethod
+    def from_multivalue(cls, column, rows=None):
+        row_ids, codes = column.explode(rows)
+        used, codes = np.unique(codes, return_inverse=True)
+        incidence = sparse.csr_matrix(
+            (np.ones(len(codes), dtype=np.int32), (row_ids, codes)),
+            shape=(len(column), len(used)),
+        )
+        # A value listed twice on one track still counts that track once
+        incidence.sum_duplicates()
+        incidence.data[:] = 1
+        return cls(column.values.take(used), (incidence.T @ incidence).tocsr())
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_pairs(self):
+        return (self.matrix.nnz - np.count_nonzero(self.tracks)) // 2
+
+    def top(self, n):
+        # Positions of the n values sharing the most tracks with others
+        order = np.argsort(-self.strength, kind='stable')[:n]
+        return order[self.strength[order] > 0]
+
+    def adjacency(self, n, measure='count'):
+        # Dense n x n frame over the top values. 'jaccard' divides shared
+        # tracks by the tracks holding either value. The diagonal is NaN.
+        top = self.top(n)
+        counts = self.matrix[top][:, top].toarray().astype(np.float64)
+        if measure == 'jaccard':
+            tracks = self.tracks[top].astype(np.float64)
+            counts = counts / (tracks[:, None] + tracks[None, :] - counts)
+        np.fill_diagonal(counts, np.nan)
+        labels = self.labels.take(top)
+        return pd.DataFrame(counts, index=labels, columns=labels)
+
+    def top_pairs(self, n):
+        upper = sparse.triu(self.matrix, k=1).tocoo()
+        order = np.argsort(-upper.data, kind='stable')[:n]
+        lo, hi = upper.row[order], upper.col[order]
+        shared = upper.data[order]
+        return pd.DataFrame({
+            'Genre A': self.labels.take(lo),
+            'Genre B': self.labels.take(hi),
+            'Shared Tracks': shared,
+            'Jaccard': (shared / (self.tracks[lo] + self.tracks[hi] - shared)).round(3),
+        })
+
+    def summary(self):
+        return {'Genres': len(self), 'Genre Pairs': int(self.n_pairs), 'Crossover Genres': int(np.count_nonzero(self.strength))}
+
+
+@st.cache_resource(max_entries=8, show_spinner="Counting genre co-occurrence...")
+def genre_cooccurrence(version, selection_key, _column, _rows):
+    return CoOccurrence.from_multivalue(_column, _rows)
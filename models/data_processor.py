@@ -1,17 +1,205 @@
+import hashlib
+import io
+import os
+import threading
+import time
+
 import pandas as pd
 import streamlit as st
+from models.catalog import Catalog
+from models.dates import RELEASE_DATE_FORMATS, parse_release_dates
+from models.snapshot import MEMORY_MAP, source_fingerprint, load_snapshot, save_snapshot
+from models.watcher import diff, list_sources, read_appended, source_state
+
+DATA_PATH = 'data/music_data.csv'
+# The columns the views read; everything else in the CSV is never parsed
+INGEST_COLUMNS = [
+    'Track Name', 'Artist Name(s)', 'Album Name', 'Album Release Date', 'Track Duration (ms)',
+    'Explicit', 'Popularity', 'Artist Genres', 'Danceability', 'Energy', 'Loudness', 'Valence',
+    'Tempo', 'Time Signature', 'Label',
+]
+# Rows parsed and indexed at a time. Ingest memory beyond the compact
+# processed frame is bounded by this, not by the size of the CSV.
+INGEST_CHUNK_ROWS = int(os.environ.get('INGEST_CHUNK_ROWS', 200_000))
+CATEGORICAL_COLUMNS = ['Label']
+FLOAT_COLUMNS = ['Danceability', 'Energy', 'Loudness', 'Valence', 'Tempo']
+# Downcast to the narrowest integer type that holds the chunk; columns
+# with missing values stay float
+INTEGER_COLUMNS = ['Popularity', 'Track Duration (ms)', 'Time Signature']
+# Shown for rows dropped because their release date could not be parsed
+REJECTED_COLUMNS = ['Track Name', 'Artist Name(s)', 'Album Release Date']
+# Which of RELEASE_DATE_FORMATS each kept row's release date is in
+DATE_FORMAT_COLUMN = 'Release Date Format'
+# Read as text so a chunk of bare years is not inferred as numbers, and so
+# categorical columns always have object categories: a chunk of empty or
+# numeric-looking labels would otherwise get float or int ones that cannot
+# be merged with the rest
+READ_DTYPES = {'Album Release Date': str, **{col: str for col in CATEGORICAL_COLUMNS}}
+# Minimum seconds between checks of the data folder for new rows
+POLL_SECONDS = float(os.environ.get('DATA_POLL_SECONDS', 5))
+
+def load_data(path=DATA_PATH):
+    return load_catalog(path).df
+
+def load_catalog(path=DATA_PATH, wait=False):
+    # `wait` returns only once no background work is left, for callers that
+    # fork (a forked child would inherit locks its parent's threads hold)
+    try:
+        live = _live_catalog(path)
+    except FileNotFoundError:
+        st.error(f"Error: '{path}' not found. Please ensure the file exists.")
+        return Catalog(pd.DataFrame())
+    live.poll()
+    if wait:
+        live.wait()
+    return live.catalog
+
+# One live catalog per data file, shared by every session in this process
+@st.cache_resource(show_spinner="Loading music data...")
+def _live_catalog(path):
+    return LiveCatalog(path)
+
+class LiveCatalog:
+    # The catalog for `path` plus any other CSVs dropped next to it, kept
+    # current in the background. Rows appended to a file and new files are
+    # parsed on their own and merged into the current catalog, so a refresh
+    # costs about the size of the delta. Sessions keep reading the previous
+    # catalog until the new one, with its filter and search indexes built,
+    # is swapped in.
+
+    def __init__(self, path):
+        self.path = os.path.abspath(path)
+        self._current = self._build()
+        self._lock = threading.Lock()
+        # The first catalog is served at once and its indexes built behind it
+        self._worker = threading.Thread(target=self._current[0].warm, name='catalog-warm', daemon=True)
+        self._worker.start()
+        self._polled = time.monotonic()
+
+    @property
+    def catalog(self):
+        return self._current[0]
+
+    def wait(self):
+        # Until the running warm-up or refresh, if any, has finished
+        worker = self._worker
+        if worker is not None:
+            worker.join()
+
+    def _sources(self):
+        # The main file first, then other CSVs in the folder by name
+        others = [p for p in list_sources(os.path.dirname(self.path)) if p != self.path]
+        return [self.path] + others
 
-def load_data():
+    def _build(self, strict=False):
+        fingerprint = source_fingerprint(self.path)
+        catalog = _build_catalog(self.path, fingerprint, strict)
+        states = {self.path: source_state(self.path, fingerprint[0])}
+        return _append(catalog, states, {p: 0 for p in self._sources()[1:]}, strict)
+
+    def poll(self):
+        # A folder scan and a stat per file, at most every POLL_SECONDS
+        with self._lock:
+            if time.monotonic() - self._polled < POLL_SECONDS or (self._worker and self._worker.is_alive()):
+                return
+            self._polled = time.monotonic()
+            try:
+                appended, rebuild = diff(self._current[1], self._sources())
+            except FileNotFoundError:
+                appended, rebuild = {}, True
+            if appended or rebuild:
+                self._worker = threading.Thread(
+                    target=self._refresh, args=(appended, rebuild), name='catalog-refresh', daemon=True
+                )
+                self._worker.start()
+
+    def _refresh(self, appended, rebuild):
+        # Reads are strict, so a source that fails to parse keeps its old
+        # state and the next poll retries the same bytes; other sources are
+        # still merged. The first error is re-raised once the rest are in.
+        if rebuild:
+            catalog, states = self._build(strict=True)
+            self._current = catalog.warm(), states
+            return
+        current, failed = self._current, None
+        for path, offset in appended.items():
+            try:
+                current = _append(*current, {path: offset}, strict=True)
+            except Exception as e:
+                failed = failed or e
+        if current[0] is not self._current[0]:
+            current[0].warm()
+        self._current = current
+        if failed is not None:
+            raise failed
+
+def _append(catalog, states, appended, strict=False):
+    # Merge the new bytes of each source into `catalog`; returns (catalog,
+    # states). A source's state only advances once its rows are merged.
+    states = dict(states)
+    for path, offset in appended.items():
+        data, state = read_appended(path, offset)
+        if state.size > offset:
+            version = hashlib.sha1(f'{catalog.version}|{path}|{state.size}|{state.tail}'.encode()).hexdigest()
+            rejected = []
+            chunks = _read_chunks(io.BytesIO(data), start=len(catalog.df), rejected=rejected, strict=strict)
+            catalog = catalog.append(chunks, version=version, rejected=rejected)
+        states[path] = state
+    return catalog, states
+
+def _build_catalog(path, fingerprint, strict=False):
+    snapshot = load_snapshot(path, fingerprint)
+    if snapshot is None:
+        rejected = []
+        catalog = Catalog.from_chunks(_read_chunks(path, rejected=rejected, strict=strict), version=fingerprint[2], rejected=rejected)
+        if not catalog.decades:
+            return catalog
+        save_snapshot(path, fingerprint, catalog.df, catalog.to_arrays())
+        if not MEMORY_MAP:
+            return catalog
+        # Re-open what was just written so this process maps the same pages as the others
+        snapshot = load_snapshot(path, fingerprint)
+        if snapshot is None:
+            return catalog
+    return Catalog(*snapshot, version=fingerprint[2])
+
+def _read_chunks(source, chunk_rows=INGEST_CHUNK_ROWS, start=0, rejected=None, strict=False):
+    # Processed chunks indexed by their global row positions (counting from
+    # `start`), for Catalog.from_chunks and Catalog.append. Rows with an
+    # unparseable release date are appended to `rejected` as they are read.
+    # Read errors are shown and end the chunks early, or with `strict` (no
+    # session to show them to) are raised.
+    try:
+        with pd.read_csv(source, usecols=_wanted, dtype=READ_DTYPES, chunksize=chunk_rows, on_bad_lines='skip') as reader:
+            for raw in reader:
+                chunk = process_data(raw, rejected)
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                start += len(chunk)
+                yield chunk
+    except FileNotFoundError:
+        if strict:
+            raise
+        st.error(f"Error: '{source}' not found. Please ensure the file exists.")
+    except Exception as e:
+        if strict:
+            raise
+        st.error(f"Error loading raw data: {e}")
+
+def _wanted(column):
+    return column in INGEST_COLUMNS
+
+def _read_raw(path):
     try:
-        df = pd.read_csv('data/music_data.csv', on_bad_lines='skip')
-        # st.write("**Raw Data Sample:**", df.head())  # Temporary for debugging, will be removed
+        df = pd.read_csv(path, usecols=_wanted, dtype=READ_DTYPES, on_bad_lines='skip')
     except FileNotFoundError:
-        st.error("Error: 'data/music_data.csv' not found. Please ensure the file exists.")
+        st.error(f"Error: '{path}' not found. Please ensure the file exists.")
         return pd.DataFrame()
     except Exception as e:
         st.error(f"Error loading raw data: {e}")
         return pd.DataFrame()
+    return df
 
+def process_data(df, rejected=None):
     if df.empty:
         st.warning("Warning: Loaded DataFrame is empty. Check the CSV content.")
         return df
@@ -20,17 +208,32 @@ def load_data():
         st.error("'Album Release Date' column missing from CSV")
         return df
 
-    df['Year'] = pd.to_datetime(df['Album Release Date'], errors='coerce').dt.year
-    df['Year'] = df['Year'].fillna(0).astype(int)
-    df['Decade'] = (df['Year'] // 10 * 10).astype(int)
-    # Remove rows where Decade is 0
-    df = df[df['Decade'] != 0]
+    # Rows without a usable release date cannot be placed in a decade; they
+    # are dropped here and reported through `rejected`
+    dates = parse_release_dates(df['Album Release Date'])
+    if rejected is not None and not dates.valid.all():
+        rejected.append(df.loc[~dates.valid, [c for c in REJECTED_COLUMNS if c in df.columns]])
+    df = df[dates.valid].reset_index(drop=True)
+    df['Year'] = dates.year[dates.valid]
+    # 0 for a bare-year release date
+    df['Month'] = dates.month[dates.valid]
+    df[DATE_FORMAT_COLUMN] = pd.Categorical.from_codes(dates.format[dates.valid], categories=list(RELEASE_DATE_FORMATS))
+    df['Decade'] = (df['Year'] // 10 * 10).astype('int16')
 
-    df['Genres'] = df['Artist Genres'].fillna('Unknown').str.split(',').apply(lambda x: [g.strip() for g in x])
     df['Popularity'] = pd.to_numeric(df['Popularity'], errors='coerce').fillna(0)
+    for col in FLOAT_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float32')
+    for col in INTEGER_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce', downcast='integer')
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype('category')
 
     if 'Decade' not in df.columns:
         st.error("Failed to create 'Decade' column")
         return df
     # Removed Processed Data Sample output as per requirement
-    return df
\ No newline at end of file
+    return df
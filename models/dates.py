@@ -0,0 +1,62 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# Release dates come as YYYY-MM-DD, YYYY-MM or a bare YYYY. Each format is
+# (length, positions of '-'); every other position must be a digit.
+RELEASE_DATE_FORMATS = {
+    'YYYY-MM-DD': (10, (4, 7)),
+    'YYYY-MM': (7, (4,)),
+    'YYYY': (4, ()),
+}
+MIN_YEAR = 1000
+_WIDTH = 11
+
+# year/month as int16/int8 arrays (0 where invalid or absent), a boolean
+# `valid` mask and the position in RELEASE_DATE_FORMATS of each row's format
+# as int8 (-1 where invalid)
+ReleaseDates = namedtuple('ReleaseDates', ['year', 'month', 'valid', 'format'])
+
+
+def parse_release_dates(values):
+    # Fixed-width code points per row replace per-element datetime parsing:
+    # digits and dashes are checked column-wise and year/month/day are
+    # assembled from digit columns. One character past the longest format is
+    # kept so longer strings are rejected rather than truncated. Surrounding
+    # whitespace is stripped first, as pd.to_datetime ignores it.
+    # Missing values become 'nan'/'None', which no format matches
+    text = np.asarray(pd.Series(values, copy=False).astype(str).str.strip().to_numpy(), dtype=f'U{_WIDTH}')
+    chars = text.view(np.uint32).reshape(len(text), _WIDTH)
+    length = np.count_nonzero(chars, axis=1)
+    digits = chars.astype(np.int32) - ord('0')
+    is_digit = (digits >= 0) & (digits <= 9)
+
+    def number(start, stop):
+        out = np.zeros(len(text), dtype=np.int32)
+        for i in range(start, stop):
+            out = out * 10 + digits[:, i]
+        return out
+
+    year, month, day = number(0, 4), number(5, 7), number(8, 10)
+    valid = np.zeros(len(text), dtype=bool)
+    has_month = np.zeros(len(text), dtype=bool)
+    found = np.full(len(text), -1, dtype=np.int8)
+    for code, (width, dashes) in enumerate(RELEASE_DATE_FORMATS.values()):
+        digit_positions = [i for i in range(width) if i not in dashes]
+        match = (length == width) & is_digit[:, digit_positions].all(axis=1) & (year >= MIN_YEAR)
+        for i in dashes:
+            match &= chars[:, i] == ord('-')
+        if width >= 7:
+            match &= (month >= 1) & (month <= 12)
+            has_month |= match
+        if width >= 10:
+            match &= (day >= 1) & (day <= 31)
+        found[match] = code
+        valid |= match
+    return ReleaseDates(
+        np.where(valid, year, 0).astype(np.int16),
+        np.where(has_month, month, 0).astype(np.int8),
+        valid,
+        found,
+    )
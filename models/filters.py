@@ -0,0 +1,140 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Filters a Selection accepts besides decades. Value filters keep rows holding
+# any of the listed values; a multi-valued column matches if any of a row's
+# values does. Range filters keep rows with low <= value <= high.
+VALUE_FILTERS = ['Explicit', 'Label', 'Track Name', 'Album Name']
+MULTI_VALUE_FILTERS = {'Artist Genres': 'genres', 'Artist Name(s)': 'artists'}
+RANGE_FILTERS = ['Popularity']
+# Columns with at most this many distinct values keep a packed bitmap per
+# value; the rest keep sorted row lists and are packed per query
+DENSE_BITMAP_VALUES = 64
+
+
+def normalize_filters(filters):
+    # Hashable, order-independent form used in selection keys; empty filters
+    # are dropped so they never split the cache
+    out = []
+    for col, value in sorted((filters or {}).items()):
+        if value is None:
+            continue
+        if col in RANGE_FILTERS:
+            out.append((col, (float(value[0]), float(value[1]))))
+        elif len(value):
+            out.append((col, tuple(sorted(set(value), key=str))))
+    return tuple(out)
+
+
+class _Postings:
+    # Row ids per value, CSR-style: value i owns rows[offsets[i]:offsets[i + 1]]
+
+    def __init__(self, n, row_ids, codes, values):
+        order = np.argsort(codes, kind='stable')
+        self.values = pd.Index(values)
+        self.rows = row_ids[order].astype(np.int32 if n < 2**31 else np.int64)
+        self.offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(codes, minlength=len(values)), out=self.offsets[1:])
+        self.bitmaps = None
+        if len(values) <= DENSE_BITMAP_VALUES:
+            self.bitmaps = [_pack(self.rows[self.offsets[i]:self.offsets[i + 1]], n) for i in range(len(values))]
+
+    def bitmap(self, values, n):
+        codes = self.values.get_indexer(pd.Index(list(values), dtype=self.values.dtype))
+        codes = codes[codes >= 0]
+        if self.bitmaps is not None:
+            out = np.zeros((n + 7) // 8, dtype=np.uint8)
+            for code in codes:
+                out |= self.bitmaps[code]
+            return out
+        return _pack(np.concatenate([self.rows[self.offsets[c]:self.offsets[c + 1]] for c in codes] or [[]]).astype(np.int64), n)
+
+    @property
+    def nbytes(self):
+        return self.rows.nbytes + self.offsets.nbytes + sum(b.nbytes for b in self.bitmaps or [])
+
+
+def _pack(rows, n):
+    mask = np.zeros(n, dtype=bool)
+    mask[rows] = True
+    return np.packbits(mask)
+
+
+class FilterIndex:
+    # Row sets over one catalog for every filterable column, each built on
+    # first use and then shared by every session: postings (and bitmaps for
+    # small columns) per value, and an argsort per range column. A selection
+    # ANDs one packed bitmap per filter and unpacks the result once, so no
+    # frame is copied and the cost of a query follows the rows it names.
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.n = len(catalog.df)
+        self._built = {}
+        self._lock = threading.Lock()
+
+    def _get(self, col, build):
+        with self._lock:
+            if col not in self._built:
+                self._built[col] = build()
+            return self._built[col]
+
+    def _postings(self, col):
+        def build():
+            if col in MULTI_VALUE_FILTERS:
+                encoded = getattr(self.catalog, MULTI_VALUE_FILTERS[col])
+                row_ids, codes = encoded.explode()
+                return _Postings(self.n, row_ids, codes, encoded.values)
+            values = self.catalog.df[col]
+            if isinstance(values.dtype, pd.CategoricalDtype):
+                codes, uniques = values.cat.codes.to_numpy(), values.cat.categories
+            else:
+                codes, uniques = pd.factorize(values)
+            row_ids = np.flatnonzero(codes >= 0)
+            return _Postings(self.n, row_ids, codes[row_ids].astype(np.int64), uniques)
+        return self._get(col, build)
+
+    def _sorted(self, col):
+        def build():
+            values = pd.to_numeric(self.catalog.df[col], errors='coerce').to_numpy(dtype='float64')
+            order = np.argsort(values, kind='stable')
+            # NaN sorts last and never falls inside a range
+            return order, values[order]
+        return self._get(col, build)
+
+    def warm(self):
+        # Build every column's row sets now, e.g. before a refreshed catalog
+        # is swapped in, so no request waits for them
+        for col in ['Decade'] + VALUE_FILTERS:
+            if col in self.catalog.df.columns:
+                self._postings(col)
+        for col, attr in MULTI_VALUE_FILTERS.items():
+            if getattr(self.catalog, attr) is not None:
+                self._postings(col)
+        for col in RANGE_FILTERS:
+            if col in self.catalog.df.columns:
+                self._sorted(col)
+
+    def bitmap(self, col, value):
+        if col == 'Decade' or col in VALUE_FILTERS or col in MULTI_VALUE_FILTERS:
+            return self._postings(col).bitmap(value, self.n)
+        if col in RANGE_FILTERS:
+            order, values = self._sorted(col)
+            low, high = value
+            return _pack(order[np.searchsorted(values, low, 'left'):np.searchsorted(values, high, 'right')], self.n)
+        raise KeyError(f"No filter for column {col!r}")
+
+    def rows(self, decades, filters=()):
+        # Row ids, ascending, in `decades` that pass every filter
+        combined = self.bitmap('Decade', decades)
+        for col, value in filters:
+            combined &= self.bitmap(col, value)
+        return np.flatnonzero(np.unpackbits(combined, count=self.n))
+
+    @property
+    def nbytes(self):
+        with self._lock:
+            built = list(self._built.values())
+        return sum(b.nbytes if isinstance(b, _Postings) else b[0].nbytes + b[1].nbytes for b in built)
@@ -0,0 +1,134 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class MultiValueColumn:
+    # Comma-separated cells stored CSR-style: row i owns
+    # codes[offsets[i]:offsets[i + 1]], and each code indexes into `values`.
+    # Rows are catalog positions, so a filtered frame's index can be used directly.
+
+    def __init__(self, offsets, codes, values):
+        self.offsets = offsets
+        self.codes = codes
+        self.values = values
+
+    @classmethod
+    def from_strings(cls, strings, sep=',', fill=None):
+        s = pd.Series(strings, copy=False)
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            s = s.astype(object)
+        if fill is not None:
+            s = s.fillna(fill)
+        s = s.fillna('').astype(str)
+        n = len(s)
+        if n == 0:
+            return cls(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), pd.Index([], dtype=object))
+        # One join/split over the whole column instead of a Python list per row
+        tokens = pd.Series(sep.join(s.tolist()).split(sep)).str.strip().to_numpy()
+        per_row = s.str.count(re.escape(sep)).to_numpy() + 1
+        row_ids = np.repeat(np.arange(n), per_row)
+        keep = tokens != ''
+        codes, values = pd.factorize(tokens[keep])
+        lengths = np.bincount(row_ids[keep], minlength=n)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        return cls(offsets, codes.astype(np.int32), pd.Index(values, dtype=object))
+
+    @classmethod
+    def concat(cls, parts):
+        # Stack columns encoded over consecutive row ranges (e.g. ingest
+        # chunks), re-coding each part against the union of their values
+        values = pd.Index([], dtype=object)
+        for part in parts:
+            values = values.append(part.values[~part.values.isin(values)])
+        offsets, codes, base = [np.zeros(1, dtype=np.int64)], [], 0
+        for i, part in enumerate(parts):
+            offsets.append(part.offsets[1:] + base)
+            # The first part's values lead the union, so its codes stand as they are
+            codes.append(part.codes if i == 0 else values.get_indexer(part.values).astype(np.int32)[part.codes])
+            base += len(part.codes)
+        return cls(np.concatenate(offsets), np.concatenate(codes) if codes else np.zeros(0, dtype=np.int32), values)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    @property
+    def nbytes(self):
+        return self.offsets.nbytes + self.codes.nbytes
+
+    def code_of(self, value):
+        return int(self.values.get_indexer([value])[0])
+
+    def explode(self, rows=None):
+        # (row id, code) for every value in the given rows, in row order
+        if rows is None:
+            return np.repeat(np.arange(len(self)), self.lengths), self.codes
+        rows = np.asarray(rows, dtype=np.int64)
+        starts = self.offsets[rows]
+        lens = self.offsets[rows + 1] - starts
+        ends = np.cumsum(lens)
+        positions = np.repeat(starts - ends + lens, lens) + np.arange(ends[-1] if len(ends) else 0)
+        return np.repeat(rows, lens), self.codes[positions]
+
+    def explode_frame(self, df, name):
+        row_ids, codes = self.explode(df.index.to_numpy())
+        out = df.loc[row_ids].copy()
+        out[name] = self.values.take(codes)
+        return out
+
+    def counts(self, rows=None):
+        _, codes = self.explode(rows)
+        return np.bincount(codes, minlength=len(self.values))
+
+    def value_counts(self, rows=None):
+        counts = self.counts(rows)
+        nonzero = np.flatnonzero(counts)
+        order = nonzero[np.argsort(-counts[nonzero], kind='stable')]
+        return pd.Series(counts[order], index=self.values.take(order), name='count')
+
+    def pairs(self, rows=None):
+        # Every unordered pair of distinct values sharing a row, as (lo, hi) codes.
+        # Rows are grouped by length so each group is one fancy-indexing step.
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows, dtype=np.int64)
+        lens = self.lengths[rows]
+        lo_parts, hi_parts = [], []
+        for length in np.unique(lens[lens > 1]):
+            group = rows[lens == length]
+            block = self.codes[self.offsets[group][:, None] + np.arange(length)]
+            i, j = np.triu_indices(length, 1)
+            a, b = block[:, i].ravel(), block[:, j].ravel()
+            lo_parts.append(np.minimum(a, b))
+            hi_parts.append(np.maximum(a, b))
+        if not lo_parts:
+            empty = np.zeros(0, dtype=np.int32)
+            return empty, empty
+        lo, hi = np.concatenate(lo_parts), np.concatenate(hi_parts)
+        distinct = lo != hi
+        return lo[distinct], hi[distinct]
+
+    def pair_counts(self, rows=None):
+        # Distinct (lo, hi) pairs with how often they co-occur
+        lo, hi = self.pairs(rows)
+        keys, weights = np.unique(lo.astype(np.int64) * len(self.values) + hi, return_counts=True)
+        return (keys // len(self.values)).astype(np.int32), (keys % len(self.values)).astype(np.int32), weights
+
+    def to_arrays(self, prefix):
+        return {
+            f'{prefix}.offsets': self.offsets,
+            f'{prefix}.codes': self.codes,
+            f'{prefix}.values': self.values.to_numpy(dtype=str),
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix):
+        return cls(
+            arrays[f'{prefix}.offsets'],
+            arrays[f'{prefix}.codes'],
+            pd.Index(arrays[f'{prefix}.values'].astype(object), dtype=object),
+        )
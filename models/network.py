@@ -0,0 +1,155 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components, laplacian
+from scipy.sparse.linalg import ArpackNoConvergence, eigsh
+
+# Above this many nodes the force-directed layout is too slow for a rerun,
+# so components are laid out spectrally and packed on a grid instead
+SPRING_LAYOUT_MAX_NODES = 1000
+LAYOUT_SEED = 42
+
+
+class CollaborationGraph:
+    # Undirected weighted graph over compact node ids 0..n-1, with degree,
+    # strength, centrality and components computed once on construction.
+
+    def __init__(self, labels, src, dst, weight):
+        nodes, inverse = np.unique(np.concatenate([src, dst]), return_inverse=True)
+        self.labels = labels.take(nodes)
+        self.src = inverse[:len(src)].astype(np.int32)
+        self.dst = inverse[len(src):].astype(np.int32)
+        self.weight = np.asarray(weight, dtype=np.int64)
+        n = len(nodes)
+        self.degree = np.bincount(self.src, minlength=n) + np.bincount(self.dst, minlength=n)
+        self.strength = np.bincount(self.src, self.weight, minlength=n) + np.bincount(self.dst, self.weight, minlength=n)
+        self.centrality = self.degree / max(n - 1, 1)
+        self.n_components, self.component = connected_components(self.adjacency(), directed=False)
+        self.component_size = np.bincount(self.component)[self.component] if n else np.zeros(0, dtype=np.int64)
+
+    @classmethod
+    def from_multivalue(cls, column, rows=None):
+        lo, hi, weight = column.pair_counts(rows)
+        return cls(column.values, lo, hi, weight)
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def n_edges(self):
+        return len(self.src)
+
+    @property
+    def key(self):
+        digest = hashlib.blake2b(digest_size=16)
+        for arr in (self.src, self.dst, self.weight):
+            digest.update(arr.tobytes())
+        digest.update('\x1f'.join(self.labels).encode())
+        return digest.hexdigest()
+
+    def adjacency(self):
+        n = len(self)
+        adj = sparse.coo_matrix((self.weight, (self.src, self.dst)), shape=(n, n)).tocsr()
+        return adj + adj.T
+
+    def prune(self, min_weight=1, min_degree=1, top_n=None):
+        # Subgraph of edges with weight >= min_weight between nodes that keep
+        # at least min_degree such edges, limited to the top_n strongest nodes
+        keep = self.weight >= min_weight
+        src, dst, weight = self.src[keep], self.dst[keep], self.weight[keep]
+        n = len(self)
+        degree = np.bincount(src, minlength=n) + np.bincount(dst, minlength=n)
+        strength = np.bincount(src, weight, minlength=n) + np.bincount(dst, weight, minlength=n)
+        candidates = np.flatnonzero(degree >= max(min_degree, 1))
+        if top_n is not None and len(candidates) > top_n:
+            candidates = candidates[np.argsort(-strength[candidates], kind='stable')[:top_n]]
+        kept = np.zeros(n, dtype=bool)
+        kept[candidates] = True
+        edges = kept[src] & kept[dst]
+        return CollaborationGraph(self.labels, src[edges], dst[edges], weight[edges])
+
+    def summary(self):
+        return {
+            'Artists': len(self),
+            'Collaborations': self.n_edges,
+            'Components': int(self.n_components),
+            'Largest Component': int(self.component_size.max()) if len(self) else 0,
+        }
+
+    def top_nodes(self, n=10):
+        order = np.lexsort((-self.strength, -self.degree))[:n]
+        return pd.DataFrame({
+            'Artist': self.labels.take(order),
+            'Collaborators': self.degree[order],
+            'Shared Tracks': self.strength[order].astype(np.int64),
+            'Degree Centrality': self.centrality[order].round(4),
+            'Component Size': self.component_size[order],
+        })
+
+
+def _spring_layout(graph):
+    import networkx as nx
+
+    G = nx.Graph()
+    G.add_nodes_from(range(len(graph)))
+    G.add_weighted_edges_from(zip(graph.src.tolist(), graph.dst.tolist(), graph.weight.tolist()))
+    pos = nx.spring_layout(G, seed=LAYOUT_SEED)
+    return np.array([pos[i] for i in range(len(graph))])
+
+
+def _spectral_component(adj):
+    n = adj.shape[0]
+    if n <= 2:
+        return np.array([[-0.5, 0.0], [0.5, 0.0]])[:n]
+    lap = laplacian(adj.astype(np.float64), normed=True)
+    if n <= 64:
+        vals, vecs = np.linalg.eigh(lap.toarray())
+    else:
+        # Smallest eigenpairs of L are the largest of 2I - L (normalized L <= 2)
+        try:
+            vals, vecs = eigsh(2 * sparse.identity(n) - lap, k=3, which='LM', tol=1e-4)
+        except ArpackNoConvergence as e:
+            vals, vecs = e.eigenvalues, e.eigenvectors
+        vals = 2 - vals
+    order = np.argsort(vals)
+    coords = vecs[:, order[1:3]]
+    if coords.shape[1] < 2:
+        coords = np.column_stack([coords, np.zeros(n)])
+    span = np.abs(coords).max(axis=0)
+    return coords / np.where(span > 0, span, 1)
+
+
+def _component_layout(graph):
+    # Spectral layout per component, components packed largest-first on a grid
+    # with cell size proportional to sqrt(component size)
+    adj = graph.adjacency()
+    pos = np.zeros((len(graph), 2))
+    order = np.argsort(-np.bincount(graph.component), kind='stable')
+    cols = int(np.ceil(np.sqrt(len(order))))
+    cell = np.sqrt(np.bincount(graph.component).max())
+    for slot, comp in enumerate(order):
+        members = np.flatnonzero(graph.component == comp)
+        scale = np.sqrt(len(members)) / 2
+        local = _spectral_component(adj[members][:, members]) * scale
+        pos[members] = local + np.array([slot % cols, -(slot // cols)]) * cell * 1.1
+    return pos
+
+
+def layout(graph):
+    if len(graph) <= SPRING_LAYOUT_MAX_NODES:
+        return _spring_layout(graph)
+    return _component_layout(graph)
+
+
+# Layouts and graphs are keyed by content, so identical selections share work
+@st.cache_data(max_entries=32, show_spinner="Laying out network...")
+def cached_layout(graph_key, _graph):
+    return layout(_graph)
+
+
+@st.cache_resource(max_entries=8, show_spinner="Building collaboration graph...")
+def collaboration_graph(version, selection_key, _column, _rows):
+    return CollaborationGraph.from_multivalue(_column, _rows)
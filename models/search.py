@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Result kind -> catalog column it searches
+SEARCH_KINDS = {'Track': 'Track Name', 'Artist': 'Artist Name(s)', 'Album': 'Album Name'}
+# Characters of each name that are indexed; longer names match on their start
+SEARCH_WIDTH = 48
+# Share of the query's trigrams a name must contain to match at all
+SEARCH_MIN_SIMILARITY = 0.5
+# Entries scanned in the first block of a query; each later block is 4x larger
+SEARCH_FIRST_BLOCK = 4096
+# Without `limit` names matching the whole query, partial matches are
+# gathered from the most popular entries down until this many times `limit`
+SEARCH_POOL = 5
+_BUILD_CHUNK = 200_000
+
+# Characters become 6-bit codes: 0 ends the name, 1 is a word break, then
+# digits and a-z; anything else shares 26 buckets, so a rare fuzzy match
+# between two non-ASCII names is the only cost of hashing them
+_SPACE = 1
+_CODES = np.full(128, _SPACE, dtype=np.uint8)
+_CODES[0] = 0
+_CODES[ord('0'):ord('9') + 1] = np.arange(2, 12)
+_CODES[ord('a'):ord('z') + 1] = np.arange(12, 38)
+_OTHER, _OTHER_BUCKETS = 38, 26
+
+
+def _encode(texts):
+    # (n, SEARCH_WIDTH + 2) codes, lower-cased, after two leading word breaks
+    lower = pd.Series(texts, dtype=object).fillna('').astype(str).str.lower().to_numpy()
+    points = np.asarray(lower, dtype=f'U{SEARCH_WIDTH}').view(np.uint32).reshape(len(lower), SEARCH_WIDTH)
+    codes = np.where(points < 128, _CODES[np.minimum(points, 127)], _OTHER + points % _OTHER_BUCKETS).astype(np.uint8)
+    # General punctuation (dashes, curly quotes) breaks words like ASCII punctuation
+    codes[(points >= 0x2000) & (points <= 0x206F)] = _SPACE
+    return np.hstack([np.full((len(lower), 2), _SPACE, dtype=np.uint8), codes])
+
+
+def _trigram_ids(codes):
+    # One id per position, -1 where there is none. A trigram's first character
+    # is dropped when a word break follows it, so every word start reads as
+    # '  a' then ' ab' and a one- or two-letter query matches as a prefix;
+    # trigrams ending in a break or past the end are never queried.
+    a, b, c = (codes[:, i:i + SEARCH_WIDTH].astype(np.int32) for i in range(3))
+    a = np.where(b == _SPACE, _SPACE, a)
+    ids = (a << 12) | (b << 6) | c
+    ids[(c <= _SPACE) | (b == 0)] = -1
+    return ids
+
+
+class SearchIndex:
+    # Trigram inverted index over the distinct track, artist and album names.
+    # Entries are numbered from most to least popular (a name's popularity is
+    # that of its most popular track), and each trigram's postings list the
+    # entries holding it in ascending order, i.e. most popular first, so the
+    # first `limit` entries a query finds are already its best ranked ones and
+    # no query reads more of the index than it needs.
+
+    def __init__(self, names, kinds, popularity, tracks, indptr, postings):
+        self.names = names
+        self.kinds = kinds
+        self.popularity = popularity
+        self.tracks = tracks
+        self.indptr = indptr
+        self.postings = postings
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        df = catalog.df
+        popularity = pd.to_numeric(df['Popularity'], errors='coerce').fillna(0).to_numpy(dtype=np.int16)
+        names, kinds, best, tracks = [], [], [], []
+        for i, (kind, col) in enumerate(SEARCH_KINDS.items()):
+            if col not in df.columns:
+                continue
+            if kind == 'Artist' and catalog.artists is not None:
+                row_ids, codes = catalog.artists.explode()
+                values = catalog.artists.values
+            else:
+                codes, values = pd.factorize(df[col])
+                row_ids = np.flatnonzero(codes >= 0)
+                codes = codes[row_ids]
+            top = pd.Series(popularity[row_ids]).groupby(codes).max()
+            names.append(np.asarray(values, dtype=object))
+            kinds.append(np.full(len(values), i, dtype=np.int8))
+            best.append(top.reindex(np.arange(len(values)), fill_value=0).to_numpy(dtype=np.int16))
+            tracks.append(np.bincount(codes, minlength=len(values)).astype(np.int32))
+        if not names:
+            return cls(np.zeros(0, dtype=object), np.zeros(0, dtype=np.int8), np.zeros(0, dtype=np.int16),
+                       np.zeros(0, dtype=np.int32), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32))
+        names, kinds, best, tracks = (np.concatenate(parts) for parts in (names, kinds, best, tracks))
+        order = np.lexsort((kinds, -best.astype(np.int32)))
+        names, kinds, best, tracks = names[order], kinds[order], best[order], tracks[order]
+
+        # Entry x trigram incidence built row by row, then transposed: the CSC
+        # conversion is a counting sort that leaves each trigram's entries ascending
+        indptr, indices = [np.zeros(1, dtype=np.int64)], []
+        for start in range(0, len(names), _BUILD_CHUNK):
+            ids = np.sort(_trigram_ids(_encode(names[start:start + _BUILD_CHUNK])), axis=1)
+            keep = ids >= 0
+            keep[:, 1:] &= ids[:, 1:] != ids[:, :-1]
+            indptr.append(indptr[-1][-1] + np.cumsum(keep.sum(axis=1)))
+            indices.append(ids[keep])
+        incidence = sparse.csr_matrix(
+            (np.ones(int(indptr[-1][-1]), dtype=np.int8), np.concatenate(indices), np.concatenate(indptr)),
+            shape=(len(names), 1 << 18),
+        ).tocsc()
+        return cls(names, kinds, best, tracks, incidence.indptr, incidence.indices)
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.kinds, self.popularity, self.tracks, self.indptr, self.postings))
+
+    def _matches(self, query, limit):
+        # Entries of the best matches, best first. Entries are walked in
+        # growing blocks, counting the query trigrams each holds, until
+        # `limit` hold all of them or SEARCH_POOL * limit hold enough; in the
+        # latter case the remaining full matches come from intersecting the
+        # unread postings, rarest first, so none is lost to the early stop.
+        ids = _trigram_ids(_encode([query]))[0]
+        ids = np.unique(ids[ids >= 0])
+        lists = [self.postings[self.indptr[i]:self.indptr[i + 1]] for i in ids]
+        complete = all(len(p) for p in lists)
+        lists = [p for p in lists if len(p)]
+        needed = max(1, int(np.ceil(len(ids) * SEARCH_MIN_SIMILARITY)))
+        empty = np.zeros(0, dtype=np.int64)
+        if len(ids) == 0 or len(lists) < needed:
+            return empty
+        full, partial, partial_hits = [empty], [empty], [empty]
+        n_full = n_partial = 0
+        lo, size = 0, SEARCH_FIRST_BLOCK
+        while lo < len(self) and n_full < limit and n_full + n_partial < SEARCH_POOL * limit:
+            hi = min(lo + size, len(self))
+            parts = []
+            for i, p in enumerate(lists):
+                end = int(np.searchsorted(p, hi))
+                parts.append(p[:end])
+                lists[i] = p[end:]
+            hits = np.bincount(np.concatenate(parts) - lo, minlength=hi - lo)
+            matched = np.flatnonzero(hits == len(ids))
+            close = np.flatnonzero((hits >= needed) & (hits < len(ids)))
+            full.append(matched + lo)
+            partial.append(close + lo)
+            partial_hits.append(hits[close])
+            n_full, n_partial = n_full + len(matched), n_partial + len(close)
+            lo, size = hi, size * 4
+        if n_full < limit and complete:
+            lists.sort(key=len)
+            rest = lists[0]
+            for p in lists[1:]:
+                if not len(rest):
+                    break
+                at = np.minimum(np.searchsorted(p, rest), len(p) - 1)
+                rest = rest[p[at] == rest]
+            full.append(rest[:limit - n_full])
+        full = np.concatenate(full)[:limit]
+        entries, hits = np.concatenate(partial), np.concatenate(partial_hits)
+        # Partial matches rank by trigrams held, then popularity (entry order)
+        rank = np.lexsort((entries, -hits))[:limit - len(full)]
+        return np.concatenate([full, entries[rank]])
+
+    def search(self, query, limit=10):
+        # Up to `limit` matches as a frame of Kind, Name, Popularity and
+        # Tracks: names containing the whole query as word prefixes first,
+        # then fuzzy matches; most popular first within each
+        entries = self._matches(query, limit)
+        return pd.DataFrame({
+            'Kind': np.array(list(SEARCH_KINDS))[self.kinds[entries]],
+            'Name': self.names[entries],
+            'Popularity': self.popularity[entries],
+            'Tracks': self.tracks[entries],
+        }, columns=['Kind', 'Name', 'Popularity', 'Tracks'])
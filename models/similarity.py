@@ -0,0 +1,191 @@
+import os
+import threading
+from functools import cached_property
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+FEATURE_COLUMNS = ['Danceability', 'Energy', 'Tempo', 'Loudness', 'Valence']
+# Decades with more tracks than this are searched through a k-d tree built on
+# first use; smaller ones are scanned directly
+TREE_MIN_ROWS = int(os.environ.get('SIMILAR_TREE_ROWS', 50_000))
+# Rows per block of the direct scan, bounding its temporary arrays
+SCAN_BLOCK_ROWS = 262_144
+
+
+class FeatureIndex:
+    # Audio features standardized to zero mean and unit variance, as float32,
+    # with rows sorted by decade so each decade is one contiguous slice and a
+    # decade filter never gathers. Tracks missing any feature are left out.
+    # `rows` maps slice positions back to catalog row ids.
+
+    def __init__(self, matrix, rows, decades, bounds, mean, std, columns=FEATURE_COLUMNS):
+        self.matrix = matrix
+        self.rows = rows
+        self.decades = decades
+        self.bounds = bounds
+        self.mean = mean
+        self.std = std
+        self.columns = columns
+        self.norms = (matrix * matrix).sum(axis=1)
+        self._trees = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, df, columns=FEATURE_COLUMNS):
+        found = _features(df, columns)
+        if found is None:
+            return None
+        rows, values, decade = found
+        mean = values.mean(axis=0) if len(values) else np.zeros(len(columns))
+        std = values.std(axis=0) if len(values) else np.ones(len(columns))
+        std[std == 0] = 1
+        matrix = np.ascontiguousarray((values - mean) / std, dtype=np.float32)
+        decades, starts = np.unique(decade, return_index=True)
+        bounds = np.append(starts, len(rows))
+        return cls(matrix, rows, [int(d) for d in decades], bounds, mean, std, columns)
+
+    def append(self, df, start):
+        # A new index with the rows of `df` added as catalog rows start,
+        # start + 1, ... They are standardized with this index's mean and
+        # std, so existing rows are copied, never re-sorted or rescaled; a
+        # full rebuild refreshes the statistics. Decades without new rows keep
+        # their k-d trees.
+        found = _features(df, self.columns)
+        if found is None or not len(found[0]):
+            return self
+        rows, values, decade = found
+        matrix = ((values - self.mean) / self.std).astype(np.float32)
+        added = np.unique(decade)
+        decades = sorted(set(self.decades) | {int(d) for d in added})
+        matrices, ids, sizes = [], [], []
+        for d in decades:
+            lo, hi = np.searchsorted(decade, d, 'left'), np.searchsorted(decade, d, 'right')
+            old = self._slice(d) if d in self.decades else (0, 0)
+            matrices += [self.matrix[old[0]:old[1]], matrix[lo:hi]]
+            ids += [self.rows[old[0]:old[1]], rows[lo:hi] + start]
+            sizes.append(old[1] - old[0] + hi - lo)
+        out = FeatureIndex(
+            np.concatenate(matrices), np.concatenate(ids), decades, np.append(0, np.cumsum(sizes)),
+            self.mean, self.std, self.columns,
+        )
+        with self._lock:
+            out._trees = {d: tree for d, tree in self._trees.items() if d not in added}
+        return out
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return self.matrix.nbytes + self.norms.nbytes + self.rows.nbytes
+
+    @cached_property
+    def positions(self):
+        # Slice position of every catalog row id up to the last indexed one;
+        # -1 for rows without features
+        positions = np.full(int(self.rows.max()) + 1 if len(self.rows) else 0, -1, dtype=np.int64)
+        positions[self.rows] = np.arange(len(self.rows))
+        return positions
+
+    def position(self, row):
+        return int(self.positions[row]) if 0 <= row < len(self.positions) else -1
+
+    def vector(self, row):
+        position = self.position(row)
+        return None if position < 0 else self.matrix[position]
+
+    def _slice(self, decade):
+        i = self.decades.index(decade)
+        return int(self.bounds[i]), int(self.bounds[i + 1])
+
+    def _tree(self, decade):
+        with self._lock:
+            tree = self._trees.get(decade)
+            if tree is None:
+                start, stop = self._slice(decade)
+                tree = self._trees[decade] = cKDTree(self.matrix[start:stop])
+            return tree
+
+    def query(self, vectors, k, decades):
+        # (row ids, distances), each of shape (len(vectors), k), for the k
+        # nearest tracks to every standardized vector among `decades`, nearest
+        # first. Missing neighbours (fewer than k tracks) are -1 / inf.
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        found_rows, found_dist = [], []
+        for decade in decades:
+            if decade not in self.decades:
+                continue
+            start, stop = self._slice(decade)
+            if stop - start > TREE_MIN_ROWS:
+                dist, idx = self._tree(decade).query(vectors, k=min(k, stop - start))
+                dist, idx = dist.reshape(len(vectors), -1), idx.reshape(len(vectors), -1)
+                found_rows.append(self.rows[start + idx])
+                found_dist.append(dist)
+                continue
+            for block in range(start, stop, SCAN_BLOCK_ROWS):
+                end = min(block + SCAN_BLOCK_ROWS, stop)
+                rows, dist = _scan(self.matrix[block:end], self.norms[block:end], vectors, k)
+                found_rows.append(self.rows[block + rows])
+                found_dist.append(dist)
+        if not found_rows:
+            return np.full((len(vectors), k), -1), np.full((len(vectors), k), np.inf)
+        rows, dist = np.hstack(found_rows), np.hstack(found_dist)
+        # Ties go to the lower row id, so results do not depend on decade order
+        order = np.lexsort((rows, dist), axis=1)[:, :k]
+        rows, dist = np.take_along_axis(rows, order, 1), np.take_along_axis(dist, order, 1)
+        if rows.shape[1] < k:
+            pad = k - rows.shape[1]
+            rows = np.pad(rows, ((0, 0), (0, pad)), constant_values=-1)
+            dist = np.pad(dist, ((0, 0), (0, pad)), constant_values=np.inf)
+        return rows, dist
+
+    def query_rows(self, vectors, k, rows):
+        # As query(), over the given catalog rows (e.g. a filtered selection).
+        # Their features are gathered, so this scans rather than using trees.
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        positions = self.positions[rows[rows < len(self.positions)]]
+        positions = positions[positions >= 0]
+        found, dist = _scan(self.matrix[positions], self.norms[positions], vectors, k)
+        order = np.lexsort((positions[found], dist), axis=1)
+        found, dist = np.take_along_axis(found, order, 1), np.take_along_axis(dist, order, 1)
+        return self.rows[positions[found]], dist
+
+    def neighbours(self, row, k, decades, rows=None):
+        # The k tracks closest to catalog row `row`, excluding itself, among
+        # `decades` or, when given, among catalog `rows`
+        vector = self.vector(row)
+        if vector is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        if rows is None:
+            rows, dist = self.query(vector, k + 1, decades)
+        else:
+            rows, dist = self.query_rows(vector, k + 1, np.asarray(rows))
+        rows, dist = rows[0], dist[0]
+        keep = (rows != row) & (rows >= 0)
+        return rows[keep][:k], dist[keep][:k]
+
+
+def _features(df, columns):
+    # (row positions, float64 values, decades) of the rows of `df` with every
+    # feature, sorted by decade; None if a column is missing
+    if any(c not in df.columns for c in columns):
+        return None
+    values = np.column_stack([pd.to_numeric(df[c], errors='coerce').to_numpy(dtype='float64') for c in columns])
+    keep = np.flatnonzero(~np.isnan(values).any(axis=1))
+    decade = df['Decade'].to_numpy()[keep]
+    order = np.argsort(decade, kind='stable')
+    return keep[order], values[keep[order]], decade[order]
+
+
+def _scan(block, norms, vectors, k):
+    # Positions within `block` of the k nearest rows to each vector, and their
+    # Euclidean distances, from |x|² - 2x·q + |q|² as one matrix product
+    d2 = norms[None, :] - 2 * vectors @ block.T + (vectors * vectors).sum(axis=1)[:, None]
+    np.maximum(d2, 0, out=d2)
+    k = min(k, block.shape[0])
+    if k == 0:
+        return np.zeros((len(vectors), 0), dtype=np.int64), np.zeros((len(vectors), 0))
+    nearest = np.argpartition(d2, k - 1, axis=1)[:, :k] if k < block.shape[0] else np.tile(np.arange(k), (len(vectors), 1))
+    return nearest, np.sqrt(np.take_along_axis(d2, nearest, 1).astype(np.float64))
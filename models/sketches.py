@@ -0,0 +1,174 @@
+import numpy as np
+import pandas as pd
+
+# Fixed histogram domains so per-decade (and per-chunk) histograms share
+# bin edges and merge by addition. Values outside a domain land in the
+# first or last bin.
+SKETCH_DOMAINS = {
+    'Danceability': (0.0, 1.0),
+    'Energy': (0.0, 1.0),
+    'Valence': (0.0, 1.0),
+    'Tempo': (0.0, 250.0),
+    'Loudness': (-60.0, 5.0),
+    'Track Duration (ms)': (0.0, 1_200_000.0),
+}
+HISTOGRAM_BINS = 240
+# Quantile summaries keep the exact values at QUANTILE_POINTS + 1 evenly
+# spaced ranks (min and max included). Interpolating between stored points
+# misplaces a rank by at most 1/QUANTILE_POINTS of the part's rows, so a
+# quantile merged from any number of decades is within 1/QUANTILE_POINTS
+# (~0.4%) of the total in rank. Each re-compression in merge()/combine()
+# adds at most another 1/QUANTILE_POINTS.
+QUANTILE_POINTS = 256
+# The lowest and highest values kept exactly per column and decade, so box
+# plots can still draw their outliers; enough for the highest fidelity
+EXTREME_VALUES = 5000
+
+
+def _summarize(values, m=QUANTILE_POINTS):
+    # `values` sorted
+    return len(values), values[np.linspace(0, len(values) - 1, m + 1).round().astype(np.int64)]
+
+
+def _extremes(values, k=EXTREME_VALUES):
+    # (lowest k, highest k) of sorted `values`, never sharing a row: with
+    # fewer than 2k values the highest part is what the lowest left over.
+    # Each part of a merge holds its own lowest and highest k, so the merged
+    # ones are among the union of theirs.
+    return values[:k], values[max(k, len(values) - k):]
+
+
+def merged_quantiles(parts, qs):
+    # Invert the row-weighted mixture of each part's piecewise-linear CDF
+    parts = [(n, points) for n, points in parts if n]
+    if not parts:
+        return np.full(len(qs), np.nan)
+    grid = np.unique(np.concatenate([points for _, points in parts]))
+    total = sum(n for n, _ in parts)
+    cdf = np.zeros(len(grid))
+    for n, points in parts:
+        ranks = np.linspace(0, 1, len(points))
+        # np.interp needs increasing x; ties in points keep the highest rank
+        x, last = np.unique(points[::-1], return_index=True)
+        cdf += n * np.interp(grid, x, ranks[::-1][last], left=0, right=1)
+    cdf /= total
+    return np.interp(qs, cdf, grid)
+
+
+class DistributionSketches:
+    # Per column and decade: fixed-bin histogram counts, a quantile summary
+    # and the EXTREME_VALUES lowest and highest values
+
+    def __init__(self, histograms, summaries, extremes):
+        self.histograms = histograms
+        self.summaries = summaries
+        self.extremes = extremes
+
+    @staticmethod
+    def edges(column):
+        low, high = SKETCH_DOMAINS[column]
+        return np.linspace(low, high, HISTOGRAM_BINS + 1)
+
+    @classmethod
+    def from_frame(cls, df):
+        histograms, summaries, extremes = {}, {}, {}
+        decades = df['Decade'].to_numpy()
+        for col in SKETCH_DOMAINS:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+            low, high = SKETCH_DOMAINS[col]
+            scaled = (np.nan_to_num(values, nan=low) - low) / (high - low) * HISTOGRAM_BINS
+            bins = np.clip(scaled, 0, HISTOGRAM_BINS - 1).astype(np.int64)
+            for decade in np.unique(decades):
+                mask = (decades == decade) & ~np.isnan(values)
+                key = (col, int(decade))
+                histograms[key] = np.bincount(bins[mask], minlength=HISTOGRAM_BINS)
+                ordered = np.sort(values[mask])
+                summaries[key] = _summarize(ordered) if len(ordered) else (0, np.zeros(0))
+                extremes[key] = _extremes(ordered)
+        return cls(histograms, summaries, extremes)
+
+    def merge(self, other):
+        # Combine sketches of disjoint row sets (e.g. two ingest chunks)
+        return DistributionSketches.combine([self, other])
+
+    @classmethod
+    def combine(cls, sketches):
+        # Merge any number of disjoint sketches with a single re-compression
+        # per key, so the error stays within 2/QUANTILE_POINTS however many
+        # ingest chunks there were
+        histograms, parts, known = {}, {}, {}
+        for sketch in sketches:
+            for key, counts in sketch.histograms.items():
+                histograms[key] = histograms[key] + counts if key in histograms else counts
+            for key, part in sketch.summaries.items():
+                parts.setdefault(key, []).append(part)
+            for key, (low, high) in sketch.extremes.items():
+                known.setdefault(key, []).extend((low, high))
+        extremes = {key: _extremes(np.sort(np.concatenate(found))) for key, found in known.items()}
+        summaries = {}
+        for key, found in parts.items():
+            found = [p for p in found if p[0]] or found[:1]
+            if len(found) == 1:
+                summaries[key] = found[0]
+            else:
+                n = sum(p[0] for p in found)
+                summaries[key] = (n, merged_quantiles(found, np.linspace(0, 1, QUANTILE_POINTS + 1)))
+        return cls(histograms, summaries, extremes)
+
+    def has(self, column):
+        return column in SKETCH_DOMAINS and any(key[0] == column for key in self.histograms)
+
+    def histogram(self, column, decades, bins=HISTOGRAM_BINS):
+        # Counts over `bins` equal bins of the column's domain; bins must divide HISTOGRAM_BINS
+        counts = sum(self.histograms.get((column, d), 0) for d in decades)
+        if np.isscalar(counts):
+            counts = np.zeros(HISTOGRAM_BINS, dtype=np.int64)
+        factor = HISTOGRAM_BINS // bins
+        return counts.reshape(-1, factor).sum(axis=1), self.edges(column)[::factor]
+
+    def quantiles(self, column, decades, qs):
+        return merged_quantiles([self.summaries[(column, d)] for d in decades if (column, d) in self.summaries], qs)
+
+    def _box(self, column, decade):
+        # Quartiles, data range, 1.5 IQR fences and the kept extreme values
+        low, q1, median, q3, high = self.quantiles(column, [decade], [0, 0.25, 0.5, 0.75, 1])
+        lows, highs = self.extremes[(column, decade)]
+        return low, q1, median, q3, high, q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1), lows, highs
+
+    def _decades(self, column, decades):
+        return [d for d in decades if self.summaries.get((column, d), (0,))[0]]
+
+    def box_stats(self, column, decades):
+        # Quartiles per decade. Whiskers end at the most extreme value inside
+        # the 1.5 IQR fences when the kept extremes reach that far, otherwise
+        # at the fences clipped to the data range.
+        rows = []
+        for d in self._decades(column, decades):
+            low, q1, median, q3, high, lower, upper, lows, highs = self._box(column, d)
+            known = np.concatenate([lows, highs])
+            # With fewer than 2 * EXTREME_VALUES rows every value is known
+            every = len(known) == self.summaries[(column, d)][0]
+            inside = known[(known >= lower) & (known <= upper)]
+            rows.append((
+                d, q1, median, q3,
+                inside[0] if len(inside) and (every or lows[-1] >= lower) else max(low, lower),
+                inside[-1] if len(inside) and (every or highs[0] <= upper) else min(high, upper),
+            ))
+        return pd.DataFrame(rows, columns=['Decade', 'q1', 'median', 'q3', 'lowerfence', 'upperfence'])
+
+    def outliers(self, column, decades, limit):
+        # (decades, values) of up to `limit` points beyond the fences, split
+        # evenly between decades and sides, most extreme first as in binned_box
+        decades = self._decades(column, decades)
+        per_side = limit // max(len(decades), 1) // 2
+        xs, ys = [np.zeros(0)], [np.zeros(0)]
+        for d in decades:
+            *_, lower, upper, lows, highs = self._box(column, d)
+            known = np.concatenate([lows, highs])
+            below, above = known[known < lower], known[known > upper]
+            shown = np.concatenate([below[:per_side], above[len(above) - min(per_side, len(above)):]])
+            xs.append(np.full(len(shown), d))
+            ys.append(shown)
+        return np.concatenate(xs), np.concatenate(ys)
@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def value_bucket_counts(column, keys, rows=None, top_n=30, bucket=1):
+    # Sparse (value x key bucket) counts for a multi-valued column, e.g. artist
+    # x release year. Memory follows the non-zero cells; only the top_n most
+    # active values are densified for display.
+    row_ids, codes = column.explode(rows)
+    if len(codes) == 0:
+        return pd.DataFrame()
+    buckets = keys[row_ids] // bucket * bucket
+    first = int(buckets.min())
+    cols = (buckets - first) // bucket
+    counts = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=np.int32), (codes, cols)),
+        shape=(len(column.values), int(cols.max()) + 1),
+    )
+    activity = np.asarray(counts.sum(axis=1)).ravel()
+    top = np.argsort(-activity, kind='stable')[:top_n]
+    top = top[activity[top] > 0]
+    return pd.DataFrame(
+        counts[top].toarray(),
+        index=pd.Index(column.values.take(top), name=column.values.name),
+        columns=first + np.arange(counts.shape[1]) * bucket,
+    )
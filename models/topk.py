@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+TOPK_COLUMNS = ['Popularity', 'Danceability', 'Energy', 'Tempo', 'Loudness', 'Valence']
+TOPK_DEPTH = 100
+
+
+class TopKIndex:
+    # For each column and decade, the `depth` largest values with their row
+    # ids, in DataFrame.nlargest order (value descending, then row order). The
+    # top k of any decade set lies in the union of those heads for k <= depth,
+    # so a query is a merge of a few hundred candidates.
+
+    def __init__(self, heads, depth):
+        self.heads = heads
+        self.depth = depth
+
+    @classmethod
+    def from_frame(cls, df, depth=TOPK_DEPTH):
+        heads = {}
+        decades = df['Decade'].to_numpy()
+        positions = np.arange(len(df))
+        for col in TOPK_COLUMNS:
+            if col not in df.columns:
+                continue
+            values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype='float64')
+            order = np.lexsort((positions, -values))
+            order = order[~np.isnan(values[order])]
+            ordered_decades = decades[order]
+            for decade in np.unique(decades):
+                rows = order[ordered_decades == decade][:depth]
+                heads[(col, int(decade))] = (df.index.to_numpy()[rows], values[rows])
+        return cls(heads, depth)
+
+    def merge(self, other):
+        # Combine indexes of disjoint row sets whose row ids are already global
+        heads = dict(self.heads)
+        for key, (rows, values) in other.heads.items():
+            if key in heads:
+                rows = np.concatenate([heads[key][0], rows])
+                values = np.concatenate([heads[key][1], values])
+                keep = np.lexsort((rows, -values))[:self.depth]
+                rows, values = rows[keep], values[keep]
+            heads[key] = (rows, values)
+        return TopKIndex(heads, self.depth)
+
+    def top(self, column, k, decades):
+        # Row ids of the k largest `column` values across `decades`, or None
+        # when k is deeper than the index and the caller must scan
+        if k > self.depth or not any((column, d) in self.heads for d in decades):
+            return None
+        parts = [self.heads[(column, d)] for d in decades if (column, d) in self.heads]
+        rows = np.concatenate([p[0] for p in parts])
+        values = np.concatenate([p[1] for p in parts])
+        return rows[np.lexsort((rows, -values))[:k]]
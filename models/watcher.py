@@ -0,0 +1,69 @@
+import hashlib
+import os
+from collections import namedtuple
+
+# Bytes just before the consumed end that must be unchanged for a grown
+# file to count as an append rather than a rewrite
+TAIL_BYTES = 64 * 1024
+
+# How much of a source has been ingested: `size` bytes of complete lines, a
+# hash of their last TAIL_BYTES, and the (st_size, st_mtime_ns) seen at the time
+SourceState = namedtuple('SourceState', ['size', 'tail', 'seen'])
+
+
+def list_sources(folder, suffix='.csv'):
+    return sorted(
+        entry.path for entry in os.scandir(folder)
+        if entry.is_file() and entry.name.endswith(suffix)
+    )
+
+
+def tail_hash(path, size):
+    start = max(0, size - TAIL_BYTES)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha1(f.read(size - start)).hexdigest()
+
+
+def _stat(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def source_state(path, size):
+    return SourceState(size, tail_hash(path, size), _stat(path))
+
+
+def diff(states, paths):
+    # (appended, rebuild). `appended` maps each grown or new path to the
+    # offset its new bytes start at; `rebuild` is True when a known source
+    # vanished, shrank or changed inside the part already ingested.
+    appended = {}
+    if set(states) - set(paths):
+        return appended, True
+    for path in paths:
+        old = states.get(path)
+        if old is None:
+            appended[path] = 0
+            continue
+        seen = _stat(path)
+        if seen == old.seen:
+            continue
+        if seen[0] < old.size or tail_hash(path, old.size) != old.tail:
+            return {}, True
+        appended[path] = old.size
+    return appended, False
+
+
+def read_appended(path, offset=0):
+    # (CSV bytes, state): the complete lines after `offset` with the header
+    # line prepended, and the state to resume from next time. A partial last
+    # line (a writer still mid-row) is left for the next read.
+    seen = _stat(path)
+    with open(path, 'rb') as f:
+        header = f.readline() if offset else b''
+        f.seek(offset)
+        data = f.read(seen[0] - offset)
+    end = data.rfind(b'\n') + 1
+    size = offset + end
+    return header + data[:end], SourceState(size, tail_hash(path, size), seen)
@@ -0,0 +1,22 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run import _quiet_streamlit
+from benchmarks.synthetic import generate
+
+_quiet_streamlit()
+
+ROWS = 20_000
+
+
+@pytest.fixture(scope='session')
+def raw():
+    # Synthetic source rows, a few with release dates no format accepts
+    df = generate(ROWS, seed=7)
+    df.loc[[5, 1234, ROWS - 3], 'Album Release Date'] = ['soon', '20-20', None]
+    df.loc[[10, 11], 'Album Release Date'] = [' 1999', '2001-04 ']
+    return df
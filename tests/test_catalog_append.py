@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.catalog import MULTI_VALUE_COLUMNS, Catalog
+from models.data_processor import _read_chunks
+from models.sketches import QUANTILE_POINTS
+
+# Row counts of the initial file and of each append
+PARTS = [9_000, 6_000, 37, 4_963]
+
+
+@pytest.fixture(scope='module')
+def catalogs(raw, tmp_path_factory):
+    # The same rows built in one pass and as a first file plus appends, each
+    # read in several chunks so chunk merging is exercised as well
+    folder = tmp_path_factory.mktemp('sources')
+    full = folder / 'full.csv'
+    raw.to_csv(full, index=False)
+    rejected = []
+    single = Catalog.from_chunks(_read_chunks(str(full), chunk_rows=len(raw), rejected=rejected, strict=True), rejected=rejected)
+
+    bounds = np.cumsum([0] + PARTS)
+    assert bounds[-1] == len(raw)
+    incremental = None
+    for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+        part = folder / f'part{i}.csv'
+        raw.iloc[lo:hi].to_csv(part, index=False)
+        rejected = []
+        if incremental is None:
+            chunks = _read_chunks(str(part), chunk_rows=4_000, rejected=rejected, strict=True)
+            incremental = Catalog.from_chunks(chunks, rejected=rejected)
+        else:
+            chunks = _read_chunks(str(part), chunk_rows=4_000, start=len(incremental.df), rejected=rejected, strict=True)
+            incremental = incremental.append(chunks, rejected=rejected)
+    return single, incremental
+
+
+def _plain(df):
+    # Category order depends on arrival order; compare values
+    return df.astype({c: object for c in df.columns if isinstance(df[c].dtype, pd.CategoricalDtype)})
+
+
+def test_frame_and_rejected_rows(catalogs):
+    single, incremental = catalogs
+    pd.testing.assert_frame_equal(_plain(incremental.df), _plain(single.df))
+    assert isinstance(incremental.df.index, pd.RangeIndex)
+    assert incremental.decades == single.decades
+    pd.testing.assert_frame_equal(incremental.rejected.reset_index(drop=True), single.rejected.reset_index(drop=True))
+    assert len(single.rejected) == 3
+
+
+@pytest.mark.parametrize('attr', [attr for attr, _ in MULTI_VALUE_COLUMNS.values()])
+def test_multivalue_columns(catalogs, attr):
+    single, incremental = (getattr(c, attr) for c in catalogs)
+    np.testing.assert_array_equal(incremental.offsets, single.offsets)
+    np.testing.assert_array_equal(incremental.values.take(incremental.codes), single.values.take(single.codes))
+
+
+def test_cube_and_top_heads(catalogs):
+    single, incremental = catalogs
+    pd.testing.assert_frame_equal(incremental.cube.cells, single.cube.cells, check_dtype=False)
+    assert incremental.topk.heads.keys() == single.topk.heads.keys()
+    for key, (rows, values) in single.topk.heads.items():
+        np.testing.assert_array_equal(incremental.topk.heads[key][0], rows, err_msg=str(key))
+        np.testing.assert_array_equal(incremental.topk.heads[key][1], values, err_msg=str(key))
+
+
+def test_sketches(catalogs):
+    single, incremental = catalogs
+    mine, theirs = incremental.sketches, single.sketches
+    assert mine.histograms.keys() == theirs.histograms.keys()
+    for key, counts in theirs.histograms.items():
+        np.testing.assert_array_equal(mine.histograms[key], counts, err_msg=str(key))
+        for low, high in zip(mine.extremes[key], theirs.extremes[key]):
+            np.testing.assert_array_equal(low, high, err_msg=str(key))
+
+    # Merged quantiles stay within two re-compressions of the exact rank,
+    # plus up to a row per merged part: a part's CDF is linear between
+    # the values it keeps, which places a quantile between two rows
+    df = single.df
+    qs = np.array([0.1, 0.25, 0.5, 0.75, 0.9])
+    for column, decade in theirs.summaries:
+        values = np.sort(pd.to_numeric(df.loc[df['Decade'] == decade, column], errors='coerce').dropna().to_numpy())
+        assert mine.summaries[(column, decade)][0] == len(values)
+        if not len(values):
+            continue
+        found = mine.quantiles(column, [decade], qs)
+        low, high = np.searchsorted(values, found, 'left'), np.searchsorted(values, found, 'right')
+        slack = 2 * len(values) / QUANTILE_POINTS + len(PARTS) + 1
+        assert np.all((qs * (len(values) - 1) >= low - slack) & (qs * (len(values) - 1) <= high + slack)), (column, decade)
+
+
+def test_features(catalogs):
+    # Appended rows keep the first file's mean and std, so compare the
+    # features each index holds rather than the standardized values
+    single, incremental = (c.features for c in catalogs)
+    assert incremental.decades == single.decades
+    np.testing.assert_array_equal(incremental.bounds, single.bounds)
+    np.testing.assert_array_equal(incremental.rows, single.rows)
+    np.testing.assert_allclose(
+        incremental.matrix * incremental.std + incremental.mean, single.matrix * single.std + single.mean,
+        rtol=1e-5, atol=1e-3,
+    )
+
+
+def test_append_file_without_a_column(raw, tmp_path):
+    # A file dropped into the folder without Label leaves the column
+    # categorical, with the new rows missing
+    first, dropped = tmp_path / 'first.csv', tmp_path / 'dropped.csv'
+    raw.iloc[:5_000].to_csv(first, index=False)
+    raw.iloc[5_000:5_020].drop(columns=['Label']).to_csv(dropped, index=False)
+    catalog = Catalog.from_chunks(_read_chunks(str(first), strict=True))
+    appended = catalog.append(_read_chunks(str(dropped), start=len(catalog.df), strict=True))
+    assert isinstance(appended.df['Label'].dtype, pd.CategoricalDtype)
+    assert list(appended.df['Label'].cat.categories) == list(catalog.df['Label'].cat.categories)
+    assert appended.df['Label'].iloc[len(catalog.df):].isna().all()
+    pd.testing.assert_series_equal(appended.df['Label'].iloc[:len(catalog.df)], catalog.df['Label'])
+
+
+@pytest.mark.parametrize('labels', [np.nan, 7])
+def test_append_empty_or_numeric_labels(raw, tmp_path, labels):
+    # Labels of a delta with none or only numeric-looking ones are still text
+    first, delta = tmp_path / 'first.csv', tmp_path / 'delta.csv'
+    raw.iloc[:5_000].to_csv(first, index=False)
+    raw.iloc[5_000:5_020].assign(Label=labels).to_csv(delta, index=False)
+    catalog = Catalog.from_chunks(_read_chunks(str(first), strict=True))
+    appended = catalog.append(_read_chunks(str(delta), start=len(catalog.df), strict=True))
+    assert len(appended.df) == len(catalog.df) + 20
+    assert appended.df['Label'].cat.categories.dtype == object
+    expected = [] if labels is np.nan else ['7']
+    assert appended.df['Label'].iloc[len(catalog.df):].dropna().unique().tolist() == expected
@@ -0,0 +1,18 @@
+import numpy as np
+import pandas as pd
+
+from models.dates import RELEASE_DATE_FORMATS, parse_release_dates
+
+
+def test_parse_release_dates():
+    dates = parse_release_dates(pd.Series([
+        '1999-12-31', ' 2020', '2001-04 ', '1987', 'soon', '2020-13', '0999', '2020-01-01x', None, np.nan,
+    ]))
+    np.testing.assert_array_equal(dates.valid, [True, True, True, True, False, False, False, False, False, False])
+    np.testing.assert_array_equal(dates.year, [1999, 2020, 2001, 1987, 0, 0, 0, 0, 0, 0])
+    np.testing.assert_array_equal(dates.month, [12, 0, 4, 0, 0, 0, 0, 0, 0, 0])
+    formats = list(RELEASE_DATE_FORMATS)
+    np.testing.assert_array_equal(
+        dates.format, [formats.index('YYYY-MM-DD'), formats.index('YYYY'), formats.index('YYYY-MM'), formats.index('YYYY')] + [-1] * 6,
+    )
+    assert dates.year.dtype == np.int16 and dates.month.dtype == np.int8
@@ -0,0 +1,41 @@
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.synthetic import generate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Runs export.main in a child. Warming is slowed down while it holds the
+# filter index lock, so a pool forked before the warm-up ends would hand its
+# workers a lock no thread releases; the timeout turns that hang into a failure.
+EXPORT = '''
+import sys, time
+import export
+from models.catalog import Catalog
+
+warm = Catalog.warm
+
+def slow_warm(self):
+    with self.filter_index._lock:
+        time.sleep(2)
+    return warm(self)
+
+Catalog.warm = slow_warm
+sys.exit(export.main(sys.argv[1:]))
+'''
+
+
+def test_export_with_worker_pool(tmp_path):
+    data, out = tmp_path / 'music_data.csv', tmp_path / 'exports'
+    generate(3_000, seed=3).to_csv(data, index=False)
+    done = subprocess.run(
+        [sys.executable, '-c', EXPORT, '--data', str(data), '--out', str(out),
+         '--selections', '1990', '--formats', 'json', '--workers', '2'],
+        cwd=ROOT, capture_output=True, text=True, timeout=120,
+    )
+    assert done.returncode == 0, done.stderr
+    with open(out / 'manifest.json') as f:
+        jobs = json.load(f)['jobs']
+    assert jobs and all(job_id.startswith('1990/') for job_id in jobs)
+    assert all((out / path).exists() for job in jobs.values() for path in job['files'])
@@ -0,0 +1,98 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from models.catalog import Catalog
+from models.data_processor import process_data
+from models.filters import MULTI_VALUE_FILTERS
+
+COMBINATIONS = 40
+MEASURES = ['Popularity', 'Energy', 'Tempo']
+
+
+@pytest.fixture(scope='module')
+def processed(raw):
+    return process_data(raw.copy())
+
+
+@pytest.fixture(scope='module')
+def catalog(processed):
+    return Catalog(processed)
+
+
+def _tokens(values, fill):
+    # Each row's comma-separated values, as MultiValueColumn splits them
+    values = values.fillna(fill) if fill is not None else values
+    return [{t.strip() for t in str(v).split(',') if t.strip()} if isinstance(v, str) else set() for v in values]
+
+
+def _random_filters(rng, df):
+    # A random subset of the filters the sidebar and search can set
+    def pick(values, k):
+        values = pd.unique(pd.Series(values).dropna())
+        return list(rng.choice(values, size=min(k, len(values)), replace=False))
+
+    options = {
+        'Explicit': lambda: [bool(rng.integers(0, 2))],
+        'Label': lambda: pick(df['Label'].astype(object), rng.integers(1, 40)),
+        'Track Name': lambda: pick(df['Track Name'], rng.integers(1, 2000)),
+        'Album Name': lambda: pick(df['Album Name'], rng.integers(1, 500)),
+        'Artist Genres': lambda: pick(sorted(set().union(*_tokens(df['Artist Genres'].head(2000), 'Unknown'))), rng.integers(1, 10)),
+        'Artist Name(s)': lambda: pick(sorted(set().union(*_tokens(df['Artist Name(s)'].head(5000), None))), rng.integers(1, 300)),
+        'Popularity': lambda: tuple(sorted(rng.integers(0, 101, 2).tolist())),
+    }
+    chosen = rng.choice(list(options), size=rng.integers(1, 4), replace=False)
+    return {col: options[col]() for col in chosen}
+
+
+def _expected_mask(df, decades, filters):
+    mask = df['Decade'].isin(decades).to_numpy()
+    for col, value in filters.items():
+        if col in MULTI_VALUE_FILTERS:
+            wanted = set(value)
+            fill = 'Unknown' if col == 'Artist Genres' else None
+            mask &= np.array([bool(tokens & wanted) for tokens in _tokens(df[col], fill)])
+        elif col == 'Popularity':
+            mask &= df[col].between(*value).to_numpy()
+        else:
+            mask &= df[col].isin(value).to_numpy()
+    return mask
+
+
+def test_filtered_rows_match_boolean_indexing(processed, catalog):
+    rng = np.random.default_rng(0)
+    for _ in range(COMBINATIONS):
+        decades = list(rng.choice(catalog.decades, size=rng.integers(1, len(catalog.decades) + 1), replace=False))
+        filters = _random_filters(rng, processed)
+        sel = catalog.select(decades, filters)
+        expected = processed[_expected_mask(processed, decades, filters)]
+        np.testing.assert_array_equal(sel.rows, expected.index.to_numpy(), err_msg=str(filters))
+
+        count = expected.groupby('Decade').size().reset_index(name='Count')
+        pd.testing.assert_frame_equal(sel.count('Decade'), count, check_dtype=False)
+        mean = expected.astype({m: 'float64' for m in MEASURES}).groupby('Decade')[MEASURES].mean().reset_index()
+        pd.testing.assert_frame_equal(sel.mean(MEASURES, 'Decade'), mean, check_dtype=False)
+        std = expected.astype({m: 'float64' for m in MEASURES}).groupby('Decade')[MEASURES].std().reset_index()
+        pd.testing.assert_frame_equal(sel.std(MEASURES, 'Decade'), std, check_dtype=False)
+
+        top = expected.nlargest(10, 'Popularity')
+        np.testing.assert_array_equal(sel.top('Popularity', 10).index, top.index)
+
+
+@pytest.mark.parametrize('by', ['Decade', 'Year', ['Decade', 'Explicit']])
+def test_decade_aggregates_match_pandas(processed, catalog, by):
+    # Decade-only selections are answered from the cube and top-k heads
+    decades = catalog.decades[1:-1]
+    sel = catalog.select(decades)
+    assert sel.decade_only
+    expected = processed[processed['Decade'].isin(decades)]
+    keys = [by] if isinstance(by, str) else by
+
+    count = expected.groupby(keys).size().reset_index(name='Count')
+    pd.testing.assert_frame_equal(sel.count(by), count, check_dtype=False)
+    mean = expected.astype({m: 'float64' for m in MEASURES}).groupby(keys)[MEASURES].mean().reset_index()
+    pd.testing.assert_frame_equal(sel.mean(MEASURES, by), mean, check_dtype=False)
+    std = expected.astype({m: 'float64' for m in MEASURES}).groupby(keys)[MEASURES].std().reset_index()
+    pd.testing.assert_frame_equal(sel.std(MEASURES, by), std, check_dtype=False)
+    for column in ['Popularity', 'Energy']:
+        np.testing.assert_array_equal(sel.top(column, 25).index, expected.nlargest(25, column).index)